@@ -33,7 +33,7 @@ from services import (
     ContextBuilder,
 )
 from services.narrative_analyzer import get_analyzer
-from services.story_graph import get_campaign_graph, set_campaign_graph
+from services.story_graph import get_campaign_graph, set_campaign_graph, shutdown_path_pool
 from services.npc_brain import get_npc_brain
 from services.twist_engine import get_twist_engine
 from services.karma_system import get_karma_system
@@ -104,6 +104,7 @@ async def lifespan(app: FastAPI):
     print("Shutting down Story Engine...")
     await db_client.close_db()
     await redis_client.close_redis()
+    shutdown_path_pool()
     print("Story Engine shutdown complete")
 
 
@@ -39,6 +39,9 @@ class KarmaChange(BaseModel):
     amount: int
     reason: str
 
+    class Config:
+        frozen = True  # Shared between analyses, see narrative_analyzer
+
 
 class PlayerAction(BaseModel):
     """A player's action/message."""
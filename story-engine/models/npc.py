@@ -2,9 +2,10 @@
 NPC models for personality and relationship tracking.
 """
 
+import sys
 from datetime import datetime
 from typing import Optional, Dict, List, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class NPCPersonality(BaseModel):
@@ -20,6 +21,9 @@ class NPCPersonality(BaseModel):
     honor: int = 50
     wisdom: int = 50
 
+    class Config:
+        frozen = True  # Read field-by-field by the NPC brain, never mutated
+
 
 class NPCState(BaseModel):
     """Complete NPC state."""
@@ -41,6 +45,12 @@ class NPCState(BaseModel):
     # Flags
     is_major: bool = False
 
+    @field_validator("apparent_role", "true_role")
+    @classmethod
+    def _intern_role(cls, role: Optional[str]) -> Optional[str]:
+        """Intern roles, which the NPC brain compares on every reaction."""
+        return sys.intern(role) if role else role
+
 
 class NPCRelationship(BaseModel):
     """Per-room NPC relationship state."""
@@ -66,6 +76,12 @@ class NPCRelationship(BaseModel):
     redemption_triggered: bool = False
     custom_state: Dict[str, Any] = Field(default_factory=dict)
 
+    @field_validator("emotional_state")
+    @classmethod
+    def _intern_emotional_state(cls, state: str) -> str:
+        """Intern the state, which keys the NPC brain's lookup tables."""
+        return sys.intern(state)
+
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat() if v else None
@@ -4,7 +4,9 @@ Analyzes player actions to detect intent, classify actions, and evaluate coheren
 """
 
 import re
-from typing import Optional, List, Dict, Any, Tuple
+import sys
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple, Set, FrozenSet, NamedTuple, Type
 from models.action import (
     PlayerAction,
     ActionAnalysis,
@@ -14,6 +16,210 @@ from models.action import (
 )
 from config import KARMA_ACTIONS
 
+# Word runs, as delimited by \b in the patterns
+_WORD = re.compile(r'\w+')
+
+# Any letter (word characters minus digits and underscore)
+_LETTER = re.compile(r'[^\W\d_]')
+
+# Patterns of the form \b(word|word word|...)\b, matchable without regex
+_LITERAL_ALTERNATION = re.compile(r'\\b\((\w+(?: \w+)*(?:\|\w+(?: \w+)*)*)\)\\b')
+
+
+# A pattern table entry: literal word sets plus regex fallbacks
+_SplitPatterns = Tuple[List[FrozenSet[str]], List[re.Pattern]]
+
+
+class _CompiledPatterns(NamedTuple):
+    """Pattern tables compiled once per process."""
+    action: Dict[ActionType, _SplitPatterns]
+    moral: Dict[MoralAlignment, _SplitPatterns]
+    karma: Dict[str, _SplitPatterns]
+    npc: Dict[str, _SplitPatterns]
+    karma_triggers: Optional[FrozenSet[str]]
+    max_phrase_words: int
+    intent: Dict[str, re.Pattern]
+    trigger: Dict[str, re.Pattern]
+    emotion: Dict[str, re.Pattern]
+    intent_prefilter: re.Pattern
+    trigger_prefilter: re.Pattern
+    emotion_prefilter: re.Pattern
+
+
+def _split_literals(patterns: List[str]) -> _SplitPatterns:
+    """
+    Split patterns into literal word sets and regexes.
+    A \\b(a|b c)\\b pattern becomes frozenset({"a", "b c"}); anything
+    else is compiled and kept as a regex fallback.
+    """
+    word_sets = []
+    compiled = []
+
+    for pattern in patterns:
+        literal = _LITERAL_ALTERNATION.fullmatch(pattern)
+        if literal:
+            word_sets.append(frozenset(literal.group(1).split("|")))
+        else:
+            compiled.append(re.compile(pattern, re.IGNORECASE))
+
+    return word_sets, compiled
+
+
+def _leading_words(patterns) -> Optional[FrozenSet[str]]:
+    """
+    Collect the words of the leading \\b(...)\\b group of every pattern.
+    Returns None if any pattern does not start with such a group.
+    """
+    words = set()
+
+    for pattern in patterns:
+        leading = _LITERAL_ALTERNATION.match(pattern)
+        if not leading:
+            return None
+        words.update(leading.group(1).split("|"))
+
+    return frozenset(words)
+
+
+def _prefilter(patterns) -> re.Pattern:
+    """Compile a single alternation matching wherever any pattern does."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+def _compile_patterns(analyzer) -> _CompiledPatterns:
+    """Pre-compile the analyzer pattern tables for performance."""
+    action = {
+        action_type: _split_literals(patterns)
+        for action_type, patterns in analyzer.ACTION_PATTERNS.items()
+    }
+    moral = {
+        alignment: _split_literals(patterns)
+        for alignment, patterns in analyzer.MORAL_PATTERNS.items()
+    }
+    karma = {
+        action_code: _split_literals(patterns)
+        for action_code, patterns in analyzer.KARMA_PATTERNS.items()
+    }
+    npc = {
+        interaction: _split_literals(patterns)
+        for interaction, patterns in analyzer.NPC_INTERACTION_PATTERNS.items()
+    }
+    tables = (action, moral, karma, npc)
+
+    # Karma patterns start with a word alternation: if none of those words
+    # is in the message the whole karma phase can be skipped
+    karma_triggers = _leading_words(
+        p for patterns in analyzer.KARMA_PATTERNS.values() for p in patterns
+    )
+
+    # Longest phrase any word set can hold, in words
+    phrases = [
+        word
+        for table in tables
+        for word_sets, _ in table.values()
+        for words in word_sets
+        for word in words
+    ]
+    phrases.extend(karma_triggers or ())
+    max_phrase_words = max((p.count(" ") + 1 for p in phrases), default=1)
+
+    return _CompiledPatterns(
+        action=action,
+        moral=moral,
+        karma=karma,
+        npc=npc,
+        karma_triggers=karma_triggers,
+        max_phrase_words=max_phrase_words,
+        intent={
+            intent: re.compile(p, re.IGNORECASE)
+            for intent, p in analyzer.INTENT_PATTERNS.items()
+        },
+        # Keyed by the returned label so hits need no string formatting
+        trigger={
+            sys.intern(f"trigger_{trigger}"): re.compile(p, re.IGNORECASE)
+            for trigger, p in analyzer.DECISION_TRIGGER_PATTERNS.items()
+        },
+        emotion={
+            emotion: re.compile(p, re.IGNORECASE)
+            for emotion, p in analyzer.EMOTION_PATTERNS.items()
+        },
+        # One alternation per scanner: a miss rules out every pattern at once
+        intent_prefilter=_prefilter(analyzer.INTENT_PATTERNS.values()),
+        trigger_prefilter=_prefilter(analyzer.DECISION_TRIGGER_PATTERNS.values()),
+        emotion_prefilter=_prefilter(analyzer.EMOTION_PATTERNS.values()),
+    )
+
+
+def _word_grams(message: str) -> Set[str]:
+    """
+    Collect every run of up to _MAX_PHRASE_WORDS consecutive words,
+    sliced from the message so separators must match exactly.
+    """
+    spans = [m.span() for m in _WORD.finditer(message)]
+    grams = set()
+
+    for i, (start, _) in enumerate(spans):
+        for _, end in spans[i:i + _MAX_PHRASE_WORDS]:
+            grams.add(message[start:end])
+
+    return grams
+
+
+# Expected action types per scene type
+_SCENE_EXPECTED_ACTIONS = {
+    "narrative": (ActionType.DIALOGUE, ActionType.EXPLORATION),
+    "combat": (ActionType.COMBAT, ActionType.MAGIC),
+    "puzzle": (ActionType.INVESTIGATION, ActionType.ITEM_USE),
+    "social": (ActionType.DIALOGUE, ActionType.SOCIAL),
+    "revelation": (ActionType.DIALOGUE, ActionType.INVESTIGATION),
+    "decision": (ActionType.DIALOGUE, ActionType.DECISION),
+}
+
+
+def _coherence_rule(
+    action_type: ActionType,
+    scene_type: Optional[str]
+) -> Tuple[float, Tuple[str, ...]]:
+    """Score an action type against a scene type (None for unknown scenes)."""
+    if action_type in _SCENE_EXPECTED_ACTIONS.get(scene_type, ()):
+        return 1.0, ("Acción coherente con la escena",)
+
+    # Some actions are always acceptable
+    if action_type in (ActionType.DIALOGUE, ActionType.NEUTRAL):
+        return 0.9, ("Acción generalmente aceptable",)
+
+    # Combat during non-combat scene
+    if action_type == ActionType.COMBAT and scene_type != "combat":
+        return 0.6, ("Acción de combate en escena no combativa - puede escalar la situación",)
+
+    # Stealth in social situation
+    if action_type == ActionType.STEALTH and scene_type == "social":
+        return 0.7, ("Intento de sigilo en situación social - puede parecer sospechoso",)
+
+    return 0.8, ("Acción no típica para esta escena pero posible",)
+
+
+# Every (scene type, action type) outcome, resolved once at import
+_COHERENCE_BY_SCENE = {
+    scene_type: {
+        action_type: _coherence_rule(action_type, scene_type)
+        for action_type in ActionType
+    }
+    for scene_type in _SCENE_EXPECTED_ACTIONS
+}
+_DEFAULT_COHERENCE = {
+    action_type: _coherence_rule(action_type, None) for action_type in ActionType
+}
+
+
+@lru_cache(maxsize=256)
+def _npc_address_pattern(npc_code: str) -> re.Pattern:
+    """Compile the ways of addressing an NPC ("a X", "con X", ...) into one regex."""
+    return re.compile(
+        rf'\b(?:a|con|a l[ao]s?|el/la) {re.escape(npc_code)}\b',
+        re.IGNORECASE
+    )
+
 
 class NarrativeAnalyzer:
     """
@@ -149,60 +355,98 @@ class NarrativeAnalyzer:
         ],
     }
 
-    def __init__(self):
-        """Initialize the analyzer."""
-        self._compile_patterns()
+    # Player intent patterns (first match wins)
+    INTENT_PATTERNS = {
+        "interrogate": r'\b(pregunt[oa]|interrog|cuestion)\b',
+        "persuade": r'\b(convenc|persuad|negoci)\b',
+        "threaten": r'\b(amenaz|intimi|adviert)\b',
+        "gather_info": r'\b(averig|descubr|investig|busc)\b.*\b(información|pistas|verdad)\b',
+        "help": r'\b(ayud|asist|socorr)\b',
+        "attack": r'\b(atac|golpe|luch|pele)\b',
+        "hide": r'\b(escond|ocult|escondi)\b',
+        "observe": r'\b(observ|mir|examin|estudi)\b',
+        "negotiate": r'\b(negoci|trat|acuerd|pacta)\b',
+        "deceive": r'\b(engañ|ment|fals)\b',
+    }
 
-    def _compile_patterns(self):
-        """Pre-compile regex patterns for performance."""
-        self._action_compiled = {
-            action_type: [re.compile(p, re.IGNORECASE) for p in patterns]
-            for action_type, patterns in self.ACTION_PATTERNS.items()
-        }
-        self._moral_compiled = {
-            alignment: [re.compile(p, re.IGNORECASE) for p in patterns]
-            for alignment, patterns in self.MORAL_PATTERNS.items()
-        }
-        self._karma_compiled = {
-            action: [re.compile(p, re.IGNORECASE) for p in patterns]
-            for action, patterns in self.KARMA_PATTERNS.items()
-        }
-        self._npc_compiled = {
-            interaction: [re.compile(p, re.IGNORECASE) for p in patterns]
-            for interaction, patterns in self.NPC_INTERACTION_PATTERNS.items()
-        }
+    # Decision-triggering patterns (first match wins)
+    # These would be more specifically defined per campaign
+    DECISION_TRIGGER_PATTERNS = {
+        "confrontation": r'\b(acuso|confronto|encaro|exijo saber)\b',
+        "alliance": r'\b(me uno|acepto|hago trato|alianza)\b',
+        "betrayal": r'\b(traiciono|vendo|revelo secreto)\b',
+        "trust": r'\b(confío|creo|le doy)\b.*\b(en|a)\b',
+        "refuse": r'\b(rechazo|me niego|no acepto)\b',
+    }
+
+    # Character emotion patterns (first match wins)
+    EMOTION_PATTERNS = {
+        "angry": r'\b(furioso|enfadado|rabioso|ira|grito)\b',
+        "sad": r'\b(triste|apenado|llorando|melancolía)\b',
+        "happy": r'\b(feliz|alegre|sonriente|contento)\b',
+        "fearful": r'\b(miedo|asustado|temeroso|temblando)\b',
+        "suspicious": r'\b(sospecho|desconfío|recelo)\b',
+        "confident": r'\b(seguro|confiado|decidido)\b',
+        "curious": r'\b(curioso|intrigado|interesado)\b',
+    }
 
-    def analyze(self, action: PlayerAction) -> ActionAnalysis:
+    @classmethod
+    def analyze(cls, action: PlayerAction) -> ActionAnalysis:
         """
         Analyze a player action and return comprehensive analysis.
         """
         message = action.message.lower().strip()
+        return cls._analyze(action, message)
+
+    @classmethod
+    def analyze_batch(cls, actions: List[PlayerAction]) -> List[ActionAnalysis]:
+        """
+        Analyze many player actions at once (turn logs, bulk reprocessing).
+        """
+        return [cls.analyze(action) for action in actions]
+
+    @classmethod
+    def _analyze(
+        cls,
+        action: PlayerAction,
+        message: str
+    ) -> ActionAnalysis:
+        """Run every analysis phase on an already normalized message."""
+        # Chat filler ("ok", "sí", "...") cannot match anything meaningful
+        if len(message) < 3 or not _LETTER.search(message):
+            return _empty_analysis(action)
+
+        grams = _word_grams(message)
 
         # Classify action type
-        action_type, type_confidence = self._classify_action_type(message)
+        action_type, type_confidence = cls._classify_action_type(message, grams)
 
         # Determine moral alignment
-        alignment, alignment_confidence = self._classify_moral_alignment(message)
+        alignment, alignment_confidence = cls._classify_moral_alignment(
+            message, grams
+        )
 
         # Detect karma actions
-        karma_actions = self._detect_karma_actions(message)
+        karma_actions = cls._detect_karma_actions(message, grams)
 
         # Detect target NPC
-        target_npc = self._detect_target_npc(message, action.active_npcs)
+        target_npc = cls._detect_target_npc(message, action.active_npcs)
 
         # Detect NPC interactions
-        npc_interactions = self._detect_npc_interactions(message, action.active_npcs)
+        npc_interactions = cls._detect_npc_interactions(
+            message, action.active_npcs, grams
+        )
 
         # Detect intent
-        intent = self._detect_intent(message, action_type)
+        intent = cls._detect_intent(message, action_type)
 
         # Calculate coherence with scene
-        coherence, coherence_notes = self._evaluate_coherence(
+        coherence, coherence_notes = cls._evaluate_coherence(
             action_type, action.current_scene_type
         )
 
         # Check for decision triggers
-        decision_trigger = self._check_decision_triggers(message)
+        decision_trigger = cls._check_decision_triggers(message)
 
         # Combined confidence
         confidence = (type_confidence + alignment_confidence) / 2
@@ -222,100 +466,114 @@ class NarrativeAnalyzer:
             coherence_notes=coherence_notes,
         )
 
-    def _classify_action_type(self, message: str) -> Tuple[ActionType, float]:
+    @staticmethod
+    def _classify_action_type(
+        message: str,
+        grams: Set[str]
+    ) -> Tuple[ActionType, float]:
         """Classify the type of action."""
-        scores = {}
-
-        for action_type, patterns in self._action_compiled.items():
-            matches = sum(1 for p in patterns if p.search(message))
+        # Running best instead of a scores dict; ties keep the first category
+        best_type = ActionType.NEUTRAL
+        best_score = 0.0
+
+        for action_type, (word_sets, patterns) in _ACTION_COMPILED.items():
+            matches = sum(1 for words in word_sets if not words.isdisjoint(grams))
+            if patterns:
+                matches += sum(1 for p in patterns if p.search(message))
             if matches > 0:
-                scores[action_type] = matches / len(patterns)
+                score = matches / (len(word_sets) + len(patterns))
+                if score > best_score:
+                    best_type, best_score = action_type, score
 
-        if not scores:
+        if not best_score:
             return ActionType.NEUTRAL, 0.5
 
-        best_type = max(scores, key=scores.get)
-        confidence = min(scores[best_type] * 2, 1.0)  # Scale up but cap at 1
+        confidence = min(best_score * 2, 1.0)  # Scale up but cap at 1
 
         return best_type, confidence
 
-    def _classify_moral_alignment(self, message: str) -> Tuple[MoralAlignment, float]:
+    @staticmethod
+    def _classify_moral_alignment(
+        message: str,
+        grams: Set[str]
+    ) -> Tuple[MoralAlignment, float]:
         """Classify the moral alignment of the action."""
-        scores = {}
-
-        for alignment, patterns in self._moral_compiled.items():
-            matches = sum(1 for p in patterns if p.search(message))
-            if matches > 0:
-                scores[alignment] = matches
-
-        if not scores:
+        # Running best instead of a scores dict; ties keep the first alignment
+        best_alignment = MoralAlignment.NEUTRAL
+        best_matches = 0
+
+        for alignment, (word_sets, patterns) in _MORAL_COMPILED.items():
+            matches = sum(1 for words in word_sets if not words.isdisjoint(grams))
+            if patterns:
+                matches += sum(1 for p in patterns if p.search(message))
+            if matches > best_matches:
+                best_alignment, best_matches = alignment, matches
+
+        if not best_matches:
             return MoralAlignment.NEUTRAL, 0.8
 
-        best_alignment = max(scores, key=scores.get)
-        confidence = min(scores[best_alignment] * 0.3 + 0.5, 1.0)
+        confidence = min(best_matches * 0.3 + 0.5, 1.0)
 
         return best_alignment, confidence
 
-    def _detect_karma_actions(self, message: str) -> List[KarmaChange]:
+    @staticmethod
+    def _detect_karma_actions(
+        message: str,
+        grams: Set[str]
+    ) -> List[KarmaChange]:
         """Detect karma-affecting actions."""
+        if _KARMA_TRIGGERS is not None and _KARMA_TRIGGERS.isdisjoint(grams):
+            return []
+
         karma_changes = []
 
-        for action_code, patterns in self._karma_compiled.items():
-            for pattern in patterns:
-                if pattern.search(message):
-                    amount = KARMA_ACTIONS.get(action_code, 0)
-                    karma_changes.append(KarmaChange(
-                        action_code=action_code,
-                        amount=amount,
-                        reason=f"Acción detectada: {action_code}"
-                    ))
-                    break  # One match per action code
+        for action_code, (word_sets, patterns) in _KARMA_COMPILED.items():
+            # One match per action code
+            if (
+                any(not words.isdisjoint(grams) for words in word_sets)
+                or any(p.search(message) for p in patterns)
+            ):
+                karma_changes.append(_KARMA_CHANGES[action_code])
 
         return karma_changes
 
+    @staticmethod
     def _detect_target_npc(
-        self,
         message: str,
         active_npcs: List[str]
     ) -> Optional[str]:
-        """Detect which NPC the action is targeting."""
-        message_lower = message.lower()
-
+        """Detect which NPC the action is targeting (message already lowercased)."""
         for npc_code in active_npcs:
             # Check if NPC name/code appears in message
-            if npc_code.lower() in message_lower:
+            if npc_code.lower() in message:
                 return npc_code
 
             # Common patterns for addressing NPCs
-            patterns = [
-                rf'\ba {npc_code}\b',
-                rf'\bcon {npc_code}\b',
-                rf'\ba l[ao]s? {npc_code}\b',
-                rf'\bel/la {npc_code}\b',
-            ]
-            for pattern in patterns:
-                if re.search(pattern, message_lower, re.IGNORECASE):
-                    return npc_code
+            if _npc_address_pattern(npc_code).search(message):
+                return npc_code
 
         return None
 
+    @classmethod
     def _detect_npc_interactions(
-        self,
+        cls,
         message: str,
-        active_npcs: List[str]
+        active_npcs: List[str],
+        grams: Set[str]
     ) -> Dict[str, str]:
         """Detect how player is interacting with NPCs."""
         interactions = {}
-        target = self._detect_target_npc(message, active_npcs)
+        target = cls._detect_target_npc(message, active_npcs)
 
         if not target:
             return interactions
 
-        for interaction_type, patterns in self._npc_compiled.items():
-            for pattern in patterns:
-                if pattern.search(message):
-                    interactions[target] = interaction_type
-                    break
+        for interaction_type, (word_sets, patterns) in _NPC_COMPILED.items():
+            if (
+                any(not words.isdisjoint(grams) for words in word_sets)
+                or any(p.search(message) for p in patterns)
+            ):
+                interactions[target] = interaction_type
 
         # Default to neutral interaction if NPC targeted but no specific type
         if target and target not in interactions:
@@ -323,24 +581,13 @@ class NarrativeAnalyzer:
 
         return interactions
 
-    def _detect_intent(self, message: str, action_type: ActionType) -> Optional[str]:
+    @staticmethod
+    def _detect_intent(message: str, action_type: ActionType) -> Optional[str]:
         """Detect the player's intent."""
-        intent_patterns = {
-            "interrogate": r'\b(pregunt[oa]|interrog|cuestion)\b',
-            "persuade": r'\b(convenc|persuad|negoci)\b',
-            "threaten": r'\b(amenaz|intimi|adviert)\b',
-            "gather_info": r'\b(averig|descubr|investig|busc)\b.*\b(información|pistas|verdad)\b',
-            "help": r'\b(ayud|asist|socorr)\b',
-            "attack": r'\b(atac|golpe|luch|pele)\b',
-            "hide": r'\b(escond|ocult|escondi)\b',
-            "observe": r'\b(observ|mir|examin|estudi)\b',
-            "negotiate": r'\b(negoci|trat|acuerd|pacta)\b',
-            "deceive": r'\b(engañ|ment|fals)\b',
-        }
-
-        for intent, pattern in intent_patterns.items():
-            if re.search(pattern, message, re.IGNORECASE):
-                return intent
+        if _INTENT_PREFILTER.search(message):
+            for intent, pattern in _INTENT_COMPILED.items():
+                if pattern.search(message):
+                    return intent
 
         # Default intents based on action type
         default_intents = {
@@ -353,92 +600,74 @@ class NarrativeAnalyzer:
 
         return default_intents.get(action_type)
 
+    @staticmethod
     def _evaluate_coherence(
-        self,
         action_type: ActionType,
         scene_type: Optional[str]
-    ) -> Tuple[float, List[str]]:
+    ) -> Tuple[float, Tuple[str, ...]]:
         """Evaluate how well the action fits the current scene."""
         if not scene_type:
-            return 1.0, []
-
-        # Define expected action types per scene type
-        scene_expected_actions = {
-            "narrative": [ActionType.DIALOGUE, ActionType.EXPLORATION],
-            "combat": [ActionType.COMBAT, ActionType.MAGIC],
-            "puzzle": [ActionType.INVESTIGATION, ActionType.ITEM_USE],
-            "social": [ActionType.DIALOGUE, ActionType.SOCIAL],
-            "revelation": [ActionType.DIALOGUE, ActionType.INVESTIGATION],
-            "decision": [ActionType.DIALOGUE, ActionType.DECISION],
-        }
-
-        expected = scene_expected_actions.get(scene_type, [])
-        notes = []
-
-        if action_type in expected:
-            return 1.0, ["Acción coherente con la escena"]
-
-        # Some actions are always acceptable
-        always_acceptable = [ActionType.DIALOGUE, ActionType.NEUTRAL]
-        if action_type in always_acceptable:
-            return 0.9, ["Acción generalmente aceptable"]
-
-        # Combat during non-combat scene
-        if action_type == ActionType.COMBAT and scene_type != "combat":
-            notes.append("Acción de combate en escena no combativa - puede escalar la situación")
-            return 0.6, notes
+            return 1.0, ()
 
-        # Stealth in social situation
-        if action_type == ActionType.STEALTH and scene_type == "social":
-            notes.append("Intento de sigilo en situación social - puede parecer sospechoso")
-            return 0.7, notes
+        return _COHERENCE_BY_SCENE.get(scene_type, _DEFAULT_COHERENCE)[action_type]
 
-        return 0.8, ["Acción no típica para esta escena pero posible"]
-
-    def _check_decision_triggers(self, message: str) -> Optional[str]:
+    @staticmethod
+    def _check_decision_triggers(message: str) -> Optional[str]:
         """Check if message triggers any decision points."""
-        # These would be more specifically defined per campaign
-        # For now, detect common decision-triggering patterns
-        trigger_patterns = {
-            "confrontation": r'\b(acuso|confronto|encaro|exijo saber)\b',
-            "alliance": r'\b(me uno|acepto|hago trato|alianza)\b',
-            "betrayal": r'\b(traiciono|vendo|revelo secreto)\b',
-            "trust": r'\b(confío|creo|le doy)\b.*\b(en|a)\b',
-            "refuse": r'\b(rechazo|me niego|no acepto)\b',
-        }
+        if not _TRIGGER_PREFILTER.search(message):
+            return None
 
-        for trigger_type, pattern in trigger_patterns.items():
-            if re.search(pattern, message, re.IGNORECASE):
-                return f"trigger_{trigger_type}"
+        for trigger_label, pattern in _TRIGGER_COMPILED.items():
+            if pattern.search(message):
+                return trigger_label
 
         return None
 
-    def detect_emotion(self, message: str) -> Optional[str]:
+    @staticmethod
+    def detect_emotion(message: str) -> Optional[str]:
         """Detect character emotion from message."""
-        emotion_patterns = {
-            "angry": r'\b(furioso|enfadado|rabioso|ira|grito)\b',
-            "sad": r'\b(triste|apenado|llorando|melancolía)\b',
-            "happy": r'\b(feliz|alegre|sonriente|contento)\b',
-            "fearful": r'\b(miedo|asustado|temeroso|temblando)\b',
-            "suspicious": r'\b(sospecho|desconfío|recelo)\b',
-            "confident": r'\b(seguro|confiado|decidido)\b',
-            "curious": r'\b(curioso|intrigado|interesado)\b',
-        }
+        if not _EMOTION_PREFILTER.search(message):
+            return None
 
-        for emotion, pattern in emotion_patterns.items():
-            if re.search(pattern, message, re.IGNORECASE):
+        for emotion, pattern in _EMOTION_COMPILED.items():
+            if pattern.search(message):
                 return emotion
 
         return None
 
 
-# Singleton instance
-_analyzer: Optional[NarrativeAnalyzer] = None
-
-
-def get_analyzer() -> NarrativeAnalyzer:
-    """Get or create analyzer instance."""
-    global _analyzer
-    if _analyzer is None:
-        _analyzer = NarrativeAnalyzer()
-    return _analyzer
+# Compiled once at import; NarrativeAnalyzer itself holds no state
+(
+    _ACTION_COMPILED,
+    _MORAL_COMPILED,
+    _KARMA_COMPILED,
+    _NPC_COMPILED,
+    _KARMA_TRIGGERS,
+    _MAX_PHRASE_WORDS,
+    _INTENT_COMPILED,
+    _TRIGGER_COMPILED,
+    _EMOTION_COMPILED,
+    _INTENT_PREFILTER,
+    _TRIGGER_PREFILTER,
+    _EMOTION_PREFILTER,
+) = _compile_patterns(NarrativeAnalyzer)
+
+# Karma changes are immutable, so one instance per code is built up front
+_KARMA_CHANGES = {
+    action_code: KarmaChange(
+        action_code=action_code,
+        amount=KARMA_ACTIONS.get(action_code, 0),
+        reason=f"Acción detectada: {action_code}"
+    )
+    for action_code in NarrativeAnalyzer.KARMA_PATTERNS
+}
+
+
+def _empty_analysis(action: PlayerAction) -> ActionAnalysis:
+    """Neutral analysis for messages too short to classify."""
+    return ActionAnalysis(original_message=action.message)
+
+
+def get_analyzer() -> Type[NarrativeAnalyzer]:
+    """Get the analyzer. It is stateless, so the class itself is returned."""
+    return NarrativeAnalyzer
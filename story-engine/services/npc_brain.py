@@ -3,12 +3,178 @@ NPC Brain Service.
 Simulates NPC personalities, emotions, and decision-making.
 """
 
-from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional, List, Dict, Any, Tuple, Literal
 from models.npc import NPCState, NPCReaction, NPCPersonality, NPCRelationship
 from config import NPC_EMOTIONAL_STATES, get_settings
 
 settings = get_settings()
 
+# Default role thresholds for NPCs without their own
+_BETRAYAL_THRESHOLD_DEFAULT = settings.betrayal_threshold_default
+_REDEMPTION_THRESHOLD_DEFAULT = settings.redemption_threshold_default
+
+# Emotional states as small ints, in config order, for table lookups
+Emotion = IntEnum(
+    "Emotion",
+    [state.upper() for state in NPC_EMOTIONAL_STATES],
+    start=0
+)
+
+# Emotional state name (as stored on relationships) -> Emotion
+_EMOTION_BY_NAME: Dict[str, Emotion] = {
+    state: Emotion[state.upper()] for state in NPC_EMOTIONAL_STATES
+}
+
+
+class Trigger(IntEnum):
+    """Events that drive emotional transitions."""
+    POSITIVE_ACTION = 0
+    NEGATIVE_ACTION = 1
+    THREAT = 2
+    KINDNESS = 3
+    BETRAYAL = 4
+    CONTINUED_KINDNESS = 5
+    CONTINUED_NEGATIVE = 6
+    PROOF_OF_INNOCENCE = 7
+    MAJOR_KINDNESS = 8
+    CONTINUED_AGGRESSION = 9
+    REASSURANCE = 10
+    CONTINUED_THREAT = 11
+    PROTECTION = 12
+
+# Base (relationship, trust) changes per action type
+_BASE_REACTIONS: Dict[str, Tuple[int, int]] = {
+    # Positive actions
+    "friendly": (5, 3),
+    "helped": (10, 8),
+    "gift": (8, 5),
+    "defended": (15, 12),
+    "saved": (25, 20),
+    "trusted": (5, 10),
+    "honest": (3, 8),
+    "respected": (5, 3),
+
+    # Negative actions
+    "hostile": (-5, -5),
+    "insulted": (-8, -5),
+    "threatened": (-10, -15),
+    "attacked": (-20, -25),
+    "lied": (-5, -15),
+    "stole": (-15, -20),
+    "betrayed": (-30, -40),
+
+    # Neutral actions
+    "neutral": (0, 0),
+    "professional": (1, 2),
+    "distant": (-2, -1),
+
+    # Special actions
+    "confrontation": (-5, 0),  # Direct but not necessarily hostile
+    "seductive": (5, -2),  # Friendly but suspicious of motives
+    "deceptive": (0, -10),  # May work but damages trust
+}
+
+# Map action types to emotional triggers
+_ACTION_TO_TRIGGER: Dict[str, Trigger] = {
+    "friendly": Trigger.POSITIVE_ACTION,
+    "helped": Trigger.POSITIVE_ACTION,
+    "gift": Trigger.POSITIVE_ACTION,
+    "defended": Trigger.MAJOR_KINDNESS,
+    "saved": Trigger.MAJOR_KINDNESS,
+    "trusted": Trigger.POSITIVE_ACTION,
+
+    "hostile": Trigger.NEGATIVE_ACTION,
+    "insulted": Trigger.NEGATIVE_ACTION,
+    "threatened": Trigger.THREAT,
+    "attacked": Trigger.CONTINUED_AGGRESSION,
+    "lied": Trigger.NEGATIVE_ACTION,
+    "betrayed": Trigger.BETRAYAL,
+}
+
+# Actions that move a compassionate NPC
+_COMPASSION_TRIGGER_ACTIONS = frozenset({"helped", "saved"})
+
+# Actions that can unlock a secret at high (>= 80) and medium (>= 70) trust
+_HIGH_TRUST_REVEAL_ACTIONS = frozenset({"saved", "defended", "trusted"})
+_MEDIUM_TRUST_REVEAL_ACTIONS = frozenset({"friendly", "helped", "honest"})
+
+# Dialogue hints per emotional state
+_STATE_HINTS: Dict[str, Tuple[str, ...]] = {
+    "friendly": ("Sonríe genuinamente", "Tono cálido y acogedor"),
+    "suspicious": ("Entrecierra los ojos", "Respuestas cautelosas"),
+    "hostile": ("Tono cortante", "Postura defensiva"),
+    "grateful": ("Expresión de agradecimiento", "Disposición a ayudar"),
+    "fearful": ("Voz temblorosa", "Evita confrontación directa"),
+    "nervous": ("Se toca el cuello/manos nerviosamente", "Evita el contacto visual"),
+    "calculating": ("Pausa antes de responder", "Elige las palabras con cuidado"),
+}
+
+# Narration guidance per emotional state
+_EMOTION_BEHAVIOR_NOTES: Dict[str, str] = {
+    "suspicious": "Hace preguntas indirectas para saber más",
+    "hostile": "Busca excusas para terminar la conversación",
+    "grateful": "Ofrece información o ayuda voluntariamente",
+}
+
+# Dialogue tone per emotional state
+_TONE_BY_STATE: Dict[str, str] = {
+    "neutral": "formal",
+    "friendly": "cálido",
+    "suspicious": "cauteloso",
+    "hostile": "cortante",
+    "grateful": "efusivo",
+    "fearful": "tembloroso",
+    "nervous": "vacilante",
+    "calculating": "medido",
+    "angry": "agresivo",
+    "sad": "melancólico",
+}
+
+# Same tones indexed by Emotion; states without a tone fall back to "neutral"
+_BASE_TONES: List[str] = [
+    _TONE_BY_STATE.get(state, "neutral") for state in NPC_EMOTIONAL_STATES
+]
+
+# (pride > 80, cunning > 80, base tone) -> tone override
+_TONE_OVERRIDES: Dict[Tuple[bool, bool, str], str] = {
+    (True, False, "friendly"): "cordial pero distante",
+    (True, True, "friendly"): "cordial pero distante",
+    (True, False, "fearful"): "tenso pero digno",
+    (True, True, "fearful"): "tenso pero digno",
+    (False, True, "hostile"): "amenazante pero sutil",
+    (True, True, "hostile"): "amenazante pero sutil",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ActionSpec:
+    """Everything a reaction needs to know about one action type."""
+    base_relation: int
+    base_trust: int
+    trigger: Optional[Trigger]
+    modifiers: Tuple[Tuple[str, float], ...]  # (trait, modifier) pairs
+    moves_compassion: bool
+    high_trust_reveal: bool
+    medium_trust_reveal: bool
+
+
+# Spec for action types without any table entry
+_DEFAULT_SPEC = ActionSpec(0, 0, None, (), False, False, False)
+
+
+def _index_modifiers_by_action(
+    trait_modifiers: Dict[str, Dict[str, float]],
+    traits: Tuple[str, ...]
+) -> Dict[str, Tuple[Tuple[str, float], ...]]:
+    """Flatten trait -> action -> modifier into action -> ((trait, modifier), ...)."""
+    by_action: Dict[str, List[Tuple[str, float]]] = {}
+    for trait in traits:
+        for action_type, modifier in trait_modifiers[trait].items():
+            by_action.setdefault(action_type, []).append((trait, modifier))
+    return {action_type: tuple(pairs) for action_type, pairs in by_action.items()}
+
 
 class NPCBrain:
     """
@@ -49,6 +215,16 @@ class NPCBrain:
         },
     }
 
+    # Traits with reaction modifiers, in NPCPersonality field order
+    _RELEVANT_TRAITS = tuple(
+        filter(TRAIT_REACTION_MODIFIERS.__contains__, NPCPersonality.model_fields)
+    )
+
+    # Same modifiers keyed by action type, so a reaction only visits its traits
+    _MODIFIERS_BY_ACTION = _index_modifiers_by_action(
+        TRAIT_REACTION_MODIFIERS, _RELEVANT_TRAITS
+    )
+
     # Emotional state transitions
     EMOTIONAL_TRANSITIONS = {
         "neutral": {
@@ -95,366 +271,37 @@ class NPCBrain:
         relationship: NPCRelationship,
         player_action: str,
         action_type: str,
-        action_details: Dict[str, Any] = None
+        action_details: Dict[str, Any] = None,
+        detail_level: Literal["scores", "full"] = "full"
     ) -> NPCReaction:
         """
         Calculate how an NPC reacts to a player action.
+        With detail_level="scores" the dialogue tone, hints and behavior notes
+        are left empty.
         """
-        action_details = action_details or {}
-
-        # Get base reaction based on action type
-        base_relation_change, base_trust_change = self._get_base_reaction(
-            action_type, action_details
-        )
-
-        # Modify based on personality
-        relation_modifier, trust_modifier = self._apply_personality_modifiers(
-            npc.personality, action_type, action_details
-        )
-
-        # Calculate final changes
-        final_relation_change = int(base_relation_change * (1 + relation_modifier))
-        final_trust_change = int(base_trust_change * (1 + trust_modifier))
-
-        # Determine new emotional state
-        new_emotional_state = self._calculate_emotional_transition(
-            relationship.emotional_state,
-            action_type,
-            final_relation_change
-        )
-
-        # Generate dialogue hints
-        dialogue_hints = self._generate_dialogue_hints(
-            npc, relationship, action_type, new_emotional_state
-        )
+        spec = _ACTION_SPECS.get(action_type, _DEFAULT_SPEC)
+        return _react(npc, relationship, spec, detail_level == "full")
 
-        # Check for special triggers
-        reveals_secret = self._check_secret_reveal(
-            npc, relationship, action_type, final_relation_change
-        )
-
-        triggers_betrayal = self._check_betrayal_trigger(
-            npc, relationship, final_relation_change
-        )
-
-        triggers_redemption = self._check_redemption_trigger(
-            npc, relationship, final_relation_change
-        )
-
-        # Generate behavior notes
-        behavior_notes = self._generate_behavior_notes(
-            npc, relationship, new_emotional_state, action_type
-        )
-
-        # Determine dialogue tone
-        dialogue_tone = self._get_dialogue_tone(new_emotional_state, npc.personality)
-
-        return NPCReaction(
-            npc_code=npc.code,
-            npc_name=npc.name,
-            emotional_response=new_emotional_state,
-            relationship_change=final_relation_change,
-            trust_change=final_trust_change,
-            dialogue_tone=dialogue_tone,
-            dialogue_hints=dialogue_hints,
-            reveals_secret=reveals_secret,
-            triggers_betrayal=triggers_betrayal,
-            triggers_redemption=triggers_redemption,
-            behavior_notes=behavior_notes
-        )
-
-    def _get_base_reaction(
-        self,
-        action_type: str,
-        action_details: Dict[str, Any]
-    ) -> Tuple[int, int]:
-        """Get base relationship and trust changes for an action type."""
-        reactions = {
-            # Positive actions
-            "friendly": (5, 3),
-            "helped": (10, 8),
-            "gift": (8, 5),
-            "defended": (15, 12),
-            "saved": (25, 20),
-            "trusted": (5, 10),
-            "honest": (3, 8),
-            "respected": (5, 3),
-
-            # Negative actions
-            "hostile": (-5, -5),
-            "insulted": (-8, -5),
-            "threatened": (-10, -15),
-            "attacked": (-20, -25),
-            "lied": (-5, -15),
-            "stole": (-15, -20),
-            "betrayed": (-30, -40),
-
-            # Neutral actions
-            "neutral": (0, 0),
-            "professional": (1, 2),
-            "distant": (-2, -1),
-
-            # Special actions
-            "confrontation": (-5, 0),  # Direct but not necessarily hostile
-            "seductive": (5, -2),  # Friendly but suspicious of motives
-            "deceptive": (0, -10),  # May work but damages trust
-        }
-
-        return reactions.get(action_type, (0, 0))
-
-    def _apply_personality_modifiers(
+    def calculate_reactions_batch(
         self,
-        personality: NPCPersonality,
-        action_type: str,
-        action_details: Dict[str, Any]
-    ) -> Tuple[float, float]:
-        """Apply personality-based modifiers to reaction."""
-        relation_modifier = 0.0
-        trust_modifier = 0.0
-
-        personality_dict = personality.model_dump()
-
-        for trait, trait_value in personality_dict.items():
-            if trait in self.TRAIT_REACTION_MODIFIERS:
-                trait_reactions = self.TRAIT_REACTION_MODIFIERS[trait]
-                if action_type in trait_reactions:
-                    # Scale modifier by trait strength (0-100 -> 0-1)
-                    strength = trait_value / 100
-                    modifier = trait_reactions[action_type] * strength
-                    relation_modifier += modifier
-                    trust_modifier += modifier * 0.8
-
-        return relation_modifier, trust_modifier
-
-    def _calculate_emotional_transition(
-        self,
-        current_state: str,
-        action_type: str,
-        relation_change: int
-    ) -> str:
-        """Calculate new emotional state based on action and current state."""
-        # Map action types to emotional triggers
-        action_to_trigger = {
-            "friendly": "positive_action",
-            "helped": "positive_action",
-            "gift": "positive_action",
-            "defended": "major_kindness",
-            "saved": "major_kindness",
-            "trusted": "positive_action",
-
-            "hostile": "negative_action",
-            "insulted": "negative_action",
-            "threatened": "threat",
-            "attacked": "continued_aggression",
-            "lied": "negative_action",
-            "betrayed": "betrayal",
-        }
-
-        trigger = action_to_trigger.get(action_type)
-
-        if not trigger:
-            # Determine trigger from relation change
-            if relation_change > 5:
-                trigger = "positive_action"
-            elif relation_change < -5:
-                trigger = "negative_action"
-            else:
-                return current_state
-
-        # Look up transition
-        if current_state in self.EMOTIONAL_TRANSITIONS:
-            transitions = self.EMOTIONAL_TRANSITIONS[current_state]
-            if trigger in transitions:
-                return transitions[trigger]
-
-        return current_state
-
-    def _generate_dialogue_hints(
-        self,
-        npc: NPCState,
-        relationship: NPCRelationship,
-        action_type: str,
-        new_state: str
-    ) -> List[str]:
-        """Generate dialogue hints based on NPC state."""
-        hints = []
-
-        # Emotional state hints
-        state_hints = {
-            "friendly": ["Sonríe genuinamente", "Tono cálido y acogedor"],
-            "suspicious": ["Entrecierra los ojos", "Respuestas cautelosas"],
-            "hostile": ["Tono cortante", "Postura defensiva"],
-            "grateful": ["Expresión de agradecimiento", "Disposición a ayudar"],
-            "fearful": ["Voz temblorosa", "Evita confrontación directa"],
-            "nervous": ["Se toca el cuello/manos nerviosamente", "Evita el contacto visual"],
-            "calculating": ["Pausa antes de responder", "Elige las palabras con cuidado"],
-        }
-
-        if new_state in state_hints:
-            hints.extend(state_hints[new_state])
-
-        # Personality-based hints
-        personality = npc.personality
-
-        if personality.pride > 70:
-            hints.append("Mantiene postura altiva y digna")
-        if personality.cunning > 70:
-            hints.append("Respuestas con doble sentido o ambiguas")
-        if personality.compassion > 70 and action_type in ["helped", "saved"]:
-            hints.append("Muestra emoción genuina")
-
-        # Secret-keeper behavior
-        if npc.secrets and relationship.trust_level < 60:
-            hints.append("Evita ciertos temas o cambia de tema sutilmente")
-
-        return hints
-
-    def _check_secret_reveal(
-        self,
-        npc: NPCState,
-        relationship: NPCRelationship,
+        npcs: List[NPCState],
+        relationships: List[NPCRelationship],
+        player_action: str,
         action_type: str,
-        relation_change: int
-    ) -> Optional[str]:
-        """Check if NPC should reveal a secret."""
-        if not npc.secrets:
-            return None
-
-        # Already known secrets
-        known = set(relationship.known_secrets)
-        unknown = [s for s in npc.secrets if s not in known]
-
-        if not unknown:
-            return None
-
-        # High trust + positive interaction can reveal secrets
-        new_trust = relationship.trust_level + relation_change
-
-        if new_trust >= 80 and action_type in ["saved", "defended", "trusted"]:
-            return unknown[0]
-
-        if new_trust >= 70 and relationship.interactions_count >= 5:
-            if action_type in ["friendly", "helped", "honest"]:
-                return unknown[0]
-
-        return None
-
-    def _check_betrayal_trigger(
-        self,
-        npc: NPCState,
-        relationship: NPCRelationship,
-        relation_change: int
-    ) -> bool:
-        """Check if conditions are met for NPC betrayal."""
-        if relationship.betrayal_triggered:
-            return False  # Already betrayed
-
-        if not npc.true_role or npc.true_role == npc.apparent_role:
-            return False  # Not a secret traitor
-
-        threshold = npc.betrayal_threshold or settings.betrayal_threshold_default
-        new_relationship = relationship.relationship_score + relation_change
-
-        # Betray if relationship drops below threshold
-        if new_relationship < threshold:
-            return True
-
-        return False
-
-    def _check_redemption_trigger(
-        self,
-        npc: NPCState,
-        relationship: NPCRelationship,
-        relation_change: int
-    ) -> bool:
-        """Check if conditions are met for NPC redemption."""
-        if relationship.redemption_triggered:
-            return False  # Already redeemed
-
-        if not npc.true_role or npc.true_role == npc.apparent_role:
-            return False  # Not a secret role to redeem from
-
-        threshold = npc.redemption_threshold or settings.redemption_threshold_default
-        new_relationship = relationship.relationship_score + relation_change
-
-        # Redeem if relationship exceeds threshold
-        if new_relationship >= threshold:
-            return True
+        action_details: Dict[str, Any] = None,
+        detail_level: Literal["scores", "full"] = "full"
+    ) -> List[NPCReaction]:
+        """
+        Calculate how several NPCs react to the same player action.
+        The action spec is resolved once for the whole batch.
+        """
+        spec = _ACTION_SPECS.get(action_type, _DEFAULT_SPEC)
+        full = detail_level == "full"
 
-        return False
-
-    def _generate_behavior_notes(
-        self,
-        npc: NPCState,
-        relationship: NPCRelationship,
-        emotional_state: str,
-        action_type: str
-    ) -> List[str]:
-        """Generate AI behavior notes for narrating this NPC."""
-        notes = []
-
-        # Secret agenda notes (for AI only)
-        if npc.true_role and npc.true_role != npc.apparent_role:
-            if npc.true_role == "traitor":
-                if relationship.relationship_score > 60:
-                    notes.append(
-                        f"{npc.name} mantiene su fachada pero internamente "
-                        "planea cómo usar esta confianza"
-                    )
-                else:
-                    notes.append(
-                        f"{npc.name} comienza a ver a los jugadores como "
-                        "una amenaza a sus planes"
-                    )
-            elif npc.true_role == "secret_ally":
-                if relationship.trust_level > 50:
-                    notes.append(
-                        f"{npc.name} considera revelar su verdadera lealtad"
-                    )
-
-        # Emotional state guidance
-        if emotional_state == "suspicious":
-            notes.append("Hace preguntas indirectas para saber más")
-        elif emotional_state == "hostile":
-            notes.append("Busca excusas para terminar la conversación")
-        elif emotional_state == "grateful":
-            notes.append("Ofrece información o ayuda voluntariamente")
-
-        return notes
-
-    def _get_dialogue_tone(
-        self,
-        emotional_state: str,
-        personality: NPCPersonality
-    ) -> str:
-        """Determine dialogue tone based on state and personality."""
-        base_tones = {
-            "neutral": "formal",
-            "friendly": "cálido",
-            "suspicious": "cauteloso",
-            "hostile": "cortante",
-            "grateful": "efusivo",
-            "fearful": "tembloroso",
-            "nervous": "vacilante",
-            "calculating": "medido",
-            "angry": "agresivo",
-            "sad": "melancólico",
-        }
-
-        base_tone = base_tones.get(emotional_state, "neutral")
-
-        # Modify by personality
-        if personality.pride > 80:
-            if base_tone == "friendly":
-                return "cordial pero distante"
-            if base_tone == "fearful":
-                return "tenso pero digno"
-
-        if personality.cunning > 80:
-            if base_tone == "hostile":
-                return "amenazante pero sutil"
-
-        return base_tone
+        return [
+            _react(npc, relationship, spec, full)
+            for npc, relationship in zip(npcs, relationships, strict=True)
+        ]
 
     def should_npc_act(
         self,
@@ -467,7 +314,7 @@ class NPCBrain:
         Returns action details or None.
         """
         # Check for betrayal execution
-        if self._check_betrayal_trigger(npc, relationship, 0):
+        if _evaluate_role_triggers(npc, relationship, 0)[0]:
             return {
                 "action": "betray",
                 "description": f"{npc.name} decide actuar contra los jugadores",
@@ -485,21 +332,317 @@ class NPCBrain:
 
         # Check for secret confession
         if relationship.trust_level > 85 and npc.secrets:
-            unknown_secrets = [
-                s for s in npc.secrets
-                if s not in relationship.known_secrets
-            ]
-            if unknown_secrets:
+            known = frozenset(relationship.known_secrets)
+            unknown_secret = next(
+                (s for s in npc.secrets if s not in known), None
+            )
+            if unknown_secret is not None:
                 return {
                     "action": "confess",
                     "description": f"{npc.name} decide confesar algo importante",
-                    "secret": unknown_secrets[0],
+                    "secret": unknown_secret,
                     "severity": "medium"
                 }
 
         return None
 
 
+def _react(
+    npc: NPCState,
+    relationship: NPCRelationship,
+    spec: ActionSpec,
+    full: bool
+) -> NPCReaction:
+    """
+    Build one NPC's reaction to the action described by spec.
+    Dialogue guidance is only generated when full is set.
+    """
+    if spec.modifiers:
+        # Modify based on personality
+        relation_modifier, trust_modifier = _apply_personality_modifiers(
+            npc.personality, spec
+        )
+
+        # Calculate final changes
+        final_relation_change = int(spec.base_relation * (1 + relation_modifier))
+        final_trust_change = int(spec.base_trust * (1 + trust_modifier))
+    else:
+        # No trait reacts to this action, base changes apply as-is
+        final_relation_change = spec.base_relation
+        final_trust_change = spec.base_trust
+
+    # Determine new emotional state
+    new_emotional_state = _calculate_emotional_transition(
+        relationship.emotional_state,
+        spec,
+        final_relation_change
+    )
+
+    # Check for special triggers
+    reveals_secret = _check_secret_reveal(
+        npc, relationship, spec, final_relation_change
+    )
+
+    triggers_betrayal, triggers_redemption = _evaluate_role_triggers(
+        npc, relationship, final_relation_change
+    )
+
+    if full:
+        # Generate dialogue hints
+        dialogue_hints = _generate_dialogue_hints(
+            npc, relationship, spec, new_emotional_state
+        )
+
+        # Generate behavior notes
+        behavior_notes = _generate_behavior_notes(
+            npc, relationship, new_emotional_state
+        )
+
+        # Determine dialogue tone
+        dialogue_tone = _get_dialogue_tone(new_emotional_state, npc.personality)
+    else:
+        dialogue_hints, behavior_notes, dialogue_tone = [], [], ""
+
+    return NPCReaction(
+        npc_code=npc.code,
+        npc_name=npc.name,
+        emotional_response=new_emotional_state,
+        relationship_change=final_relation_change,
+        trust_change=final_trust_change,
+        dialogue_tone=dialogue_tone,
+        dialogue_hints=dialogue_hints,
+        reveals_secret=reveals_secret,
+        triggers_betrayal=triggers_betrayal,
+        triggers_redemption=triggers_redemption,
+        behavior_notes=behavior_notes
+    )
+
+
+def _apply_personality_modifiers(
+    personality: NPCPersonality,
+    spec: ActionSpec
+) -> Tuple[float, float]:
+    """Apply personality-based modifiers to reaction."""
+    relation_modifier = 0.0
+    trust_modifier = 0.0
+
+    for trait, trait_modifier in spec.modifiers:
+        # Scale modifier by trait strength (0-100 -> 0-1)
+        strength = getattr(personality, trait) / 100
+        modifier = trait_modifier * strength
+        relation_modifier += modifier
+        trust_modifier += modifier * 0.8
+
+    return relation_modifier, trust_modifier
+
+
+def _calculate_emotional_transition(
+    current_state: str,
+    spec: ActionSpec,
+    relation_change: int
+) -> str:
+    """Calculate new emotional state based on action and current state."""
+    trigger = spec.trigger
+
+    if trigger is None:
+        # Determine trigger from relation change
+        if relation_change > 5:
+            trigger = Trigger.POSITIVE_ACTION
+        elif relation_change < -5:
+            trigger = Trigger.NEGATIVE_ACTION
+        else:
+            return current_state
+
+    # Look up transition
+    state = _EMOTION_BY_NAME.get(current_state)
+    if state is None:
+        return current_state
+
+    next_state = _TRANSITION_TABLE[state][trigger]
+    return next_state if next_state is not None else current_state
+
+
+def _generate_dialogue_hints(
+    npc: NPCState,
+    relationship: NPCRelationship,
+    spec: ActionSpec,
+    new_state: str
+) -> List[str]:
+    """Generate dialogue hints based on NPC state."""
+    # Emotional state hints
+    hints = list(_STATE_HINTS.get(new_state, ()))
+
+    # Personality-based hints
+    personality = npc.personality
+
+    if personality.pride > 70:
+        hints.append("Mantiene postura altiva y digna")
+    if personality.cunning > 70:
+        hints.append("Respuestas con doble sentido o ambiguas")
+    if personality.compassion > 70 and spec.moves_compassion:
+        hints.append("Muestra emoción genuina")
+
+    # Secret-keeper behavior
+    if npc.secrets and relationship.trust_level < 60:
+        hints.append("Evita ciertos temas o cambia de tema sutilmente")
+
+    return hints
+
+
+def _check_secret_reveal(
+    npc: NPCState,
+    relationship: NPCRelationship,
+    spec: ActionSpec,
+    relation_change: int
+) -> Optional[str]:
+    """Check if NPC should reveal a secret."""
+    if not npc.secrets:
+        return None
+
+    # High trust + positive interaction can reveal secrets
+    new_trust = relationship.trust_level + relation_change
+
+    if new_trust < 70:
+        return None
+
+    high_trust_reveal = new_trust >= 80 and spec.high_trust_reveal
+    medium_trust_reveal = (
+        relationship.interactions_count >= 5 and spec.medium_trust_reveal
+    )
+    if not (high_trust_reveal or medium_trust_reveal):
+        return None
+
+    # First secret not already known
+    known = frozenset(relationship.known_secrets)
+    return next((s for s in npc.secrets if s not in known), None)
+
+
+def _evaluate_role_triggers(
+    npc: NPCState,
+    relationship: NPCRelationship,
+    relation_change: int
+) -> Tuple[bool, bool]:
+    """Check if conditions are met for NPC betrayal and redemption."""
+    if relationship.betrayal_triggered and relationship.redemption_triggered:
+        return False, False  # Already betrayed and redeemed
+
+    if not npc.true_role or npc.true_role == npc.apparent_role:
+        return False, False  # No secret role to betray or redeem from
+
+    new_relationship = relationship.relationship_score + relation_change
+
+    # Betray if relationship drops below threshold
+    triggers_betrayal = (
+        not relationship.betrayal_triggered
+        and new_relationship < (
+            npc.betrayal_threshold or _BETRAYAL_THRESHOLD_DEFAULT
+        )
+    )
+
+    # Redeem if relationship exceeds threshold
+    triggers_redemption = (
+        not relationship.redemption_triggered
+        and new_relationship >= (
+            npc.redemption_threshold or _REDEMPTION_THRESHOLD_DEFAULT
+        )
+    )
+
+    return triggers_betrayal, triggers_redemption
+
+
+def _generate_behavior_notes(
+    npc: NPCState,
+    relationship: NPCRelationship,
+    emotional_state: str
+) -> List[str]:
+    """Generate AI behavior notes for narrating this NPC."""
+    notes = []
+
+    # Secret agenda notes (for AI only)
+    true_role = npc.true_role
+    if true_role and true_role != npc.apparent_role:
+        name = npc.name
+        if true_role == "traitor":
+            if relationship.relationship_score > 60:
+                notes.append(
+                    f"{name} mantiene su fachada pero internamente "
+                    "planea cómo usar esta confianza"
+                )
+            else:
+                notes.append(
+                    f"{name} comienza a ver a los jugadores como "
+                    "una amenaza a sus planes"
+                )
+        elif true_role == "secret_ally":
+            if relationship.trust_level > 50:
+                notes.append(
+                    f"{name} considera revelar su verdadera lealtad"
+                )
+
+    # Emotional state guidance
+    note = _EMOTION_BEHAVIOR_NOTES.get(emotional_state)
+    if note:
+        notes.append(note)
+
+    return notes
+
+
+def _get_dialogue_tone(
+    emotional_state: str,
+    personality: NPCPersonality
+) -> str:
+    """Determine dialogue tone based on state and personality."""
+    state = _EMOTION_BY_NAME.get(emotional_state)
+    base_tone = _BASE_TONES[state] if state is not None else "neutral"
+
+    # Modify by personality
+    return _TONE_OVERRIDES.get(
+        (personality.pride > 80, personality.cunning > 80, base_tone), base_tone
+    )
+
+
+def _build_transition_table(
+    transitions: Dict[str, Dict[str, str]]
+) -> List[List[Optional[str]]]:
+    """Lay out state -> trigger -> next state as a [Emotion][Trigger] table."""
+    table: List[List[Optional[str]]] = [[None] * len(Trigger) for _ in Emotion]
+    for state, by_trigger in transitions.items():
+        for trigger, next_state in by_trigger.items():
+            table[_EMOTION_BY_NAME[state]][Trigger[trigger.upper()]] = next_state
+    return table
+
+
+# Next emotional state by [Emotion][Trigger], None when the state holds
+_TRANSITION_TABLE = _build_transition_table(NPCBrain.EMOTIONAL_TRANSITIONS)
+
+
+def _build_action_specs(
+    modifiers_by_action: Dict[str, Tuple[Tuple[str, float], ...]]
+) -> Dict[str, ActionSpec]:
+    """Resolve every per-action table into one ActionSpec per action type."""
+    action_types = (
+        _BASE_REACTIONS.keys() | _ACTION_TO_TRIGGER.keys()
+        | modifiers_by_action.keys()
+    )
+    specs = {}
+    for action_type in action_types:
+        base_relation, base_trust = _BASE_REACTIONS.get(action_type, (0, 0))
+        specs[action_type] = ActionSpec(
+            base_relation=base_relation,
+            base_trust=base_trust,
+            trigger=_ACTION_TO_TRIGGER.get(action_type),
+            modifiers=modifiers_by_action.get(action_type, ()),
+            moves_compassion=action_type in _COMPASSION_TRIGGER_ACTIONS,
+            high_trust_reveal=action_type in _HIGH_TRUST_REVEAL_ACTIONS,
+            medium_trust_reveal=action_type in _MEDIUM_TRUST_REVEAL_ACTIONS,
+        )
+    return specs
+
+
+# Action type -> preresolved spec, unknown types use _DEFAULT_SPEC
+_ACTION_SPECS = _build_action_specs(NPCBrain._MODIFIERS_BY_ACTION)
+
+
 # Singleton instance
 _npc_brain: Optional[NPCBrain] = None
 
@@ -3,12 +3,116 @@ Story Graph Service.
 Manages the graph of story decisions, branches, and pathfinding to endings.
 """
 
+import heapq
+import math
+import sys
 import networkx as nx
-from typing import Optional, List, Dict, Any, Set, Tuple
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, Set, Tuple, FrozenSet, Callable, Iterator
 from dataclasses import dataclass
+from itertools import islice, repeat
 
 
-@dataclass
+# ("flag_true" | "flag_false", flag), ("flag_equals", flag, value)
+# or ("decision", code, option)
+ParsedCondition = Tuple[str, ...]
+
+
+def _parse_condition(condition: Optional[str]) -> Optional[ParsedCondition]:
+    """
+    Parse an edge condition ("flag:value" or "decision:code:option") once.
+    Returns None when the condition is always satisfied.
+    """
+    if not condition:
+        return None
+
+    parts = condition.split(":")
+
+    if len(parts) == 2:
+        # Flag check: "flag_name:true/false"
+        flag_name, expected = parts
+        if expected.lower() == "true":
+            return ("flag_true", flag_name)
+        if expected.lower() == "false":
+            return ("flag_false", flag_name)
+        return ("flag_equals", flag_name, expected)
+
+    if len(parts) == 3 and parts[0] == "decision":
+        # Decision check: "decision:code:option"
+        return ("decision", parts[1], parts[2])
+
+    return None  # Unknown condition format, assume satisfied
+
+
+def _check_flag_true(
+    condition: ParsedCondition,
+    decisions_made: Dict[str, str],
+    story_flags: Dict[str, Any]
+) -> bool:
+    """Check if a flag is set to a truthy value."""
+    return bool(story_flags.get(condition[1]))
+
+
+def _check_flag_false(
+    condition: ParsedCondition,
+    decisions_made: Dict[str, str],
+    story_flags: Dict[str, Any]
+) -> bool:
+    """Check if a flag is missing or falsy."""
+    return not story_flags.get(condition[1])
+
+
+def _check_flag_equals(
+    condition: ParsedCondition,
+    decisions_made: Dict[str, str],
+    story_flags: Dict[str, Any]
+) -> bool:
+    """Check if a flag, as a string, equals the expected value."""
+    return str(story_flags.get(condition[1])) == condition[2]
+
+
+def _check_decision(
+    condition: ParsedCondition,
+    decisions_made: Dict[str, str],
+    story_flags: Dict[str, Any]
+) -> bool:
+    """Check if a decision was made with the expected option."""
+    return decisions_made.get(condition[1]) == condition[2]
+
+
+# Parsed condition kind -> evaluator
+_CONDITION_CHECKS: Dict[
+    str, Callable[[ParsedCondition, Dict[str, str], Dict[str, Any]], bool]
+] = {
+    "flag_true": _check_flag_true,
+    "flag_false": _check_flag_false,
+    "flag_equals": _check_flag_equals,
+    "decision": _check_decision,
+}
+
+
+# Hashable (decisions, flags) snapshot used as a cache key. Entries are
+# (key, type, value) so that values comparing equal across types (1, 1.0, True)
+# stay distinct; flag_equals compares their str() forms
+StateSnapshot = FrozenSet[Tuple[str, type, Any]]
+StateKey = Tuple[StateSnapshot, StateSnapshot]
+
+# Upper bound on entries in each per-state cache of a graph
+_STATE_CACHE_SIZE = 8192
+
+# Log of the 0.1 penalty on edges whose condition fails
+_LOG_UNSATISFIED_PENALTY = math.log(0.1)
+
+# Below these sizes path search runs serially, shipping work to the pool would dominate
+_PARALLEL_MIN_ENDINGS = 4
+_PARALLEL_MIN_NODES = 200
+
+# node -> successor -> (probability, parsed condition)
+Adjacency = Dict[str, Dict[str, Tuple[float, Optional[ParsedCondition]]]]
+
+
+@dataclass(slots=True)
 class StoryNode:
     """A node in the story graph."""
     node_id: str
@@ -20,7 +124,7 @@ class StoryNode:
     data: Dict[str, Any] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class StoryEdge:
     """An edge in the story graph."""
     from_node: str
@@ -42,10 +146,42 @@ class StoryGraph:
         self._endings: Set[str] = set()
         self._decision_points: Set[str] = set()
 
+        # Bumped on every mutation; the caches below only hold this version
+        self._graph_version = 0
+        self._paths_cache: Dict[Tuple, Dict[str, Tuple[Tuple[str, ...], ...]]] = {}
+        self._reachable_endings: Optional[Dict[str, Set[str]]] = None
+        self._has_cycles: Optional[bool] = None
+        self._adjacency: Optional[Adjacency] = None
+        self._edge_conditions: FrozenSet[ParsedCondition] = frozenset()
+        self._probabilities_bounded = True  # Every edge probability in [0, 1]
+
+        # Per (decisions, flags) state: failing conditions and best weight per
+        # ending from a node
+        self._unsatisfied_cache: Dict[StateKey, FrozenSet[ParsedCondition]] = {}
+        self._ending_weights_cache: Dict[Tuple, Dict[str, float]] = {}
+
+        # Per-node analyses, callers get copies so they may mutate them
+        self._branch_analysis_cache: Dict[str, Dict[str, Any]] = {}
+        self._critical_path_cache: Dict[Tuple[str, str], Optional[List[str]]] = {}
+
+    def _mark_changed(self) -> None:
+        """Invalidate everything derived from the graph structure."""
+        self._graph_version += 1
+        self._paths_cache.clear()
+        self._reachable_endings = None
+        self._has_cycles = None
+        self._adjacency = None
+        self._edge_conditions = frozenset()
+        self._unsatisfied_cache.clear()
+        self._ending_weights_cache.clear()
+        self._branch_analysis_cache.clear()
+        self._critical_path_cache.clear()
+
     def add_node(self, node: StoryNode) -> None:
         """Add a node to the graph."""
+        node_id = _intern_id(node.node_id)
         self.graph.add_node(
-            node.node_id,
+            node_id,
             node_type=node.node_type,
             title=node.title,
             act=node.act,
@@ -53,21 +189,24 @@ class StoryGraph:
             scene=node.scene,
             data=node.data or {}
         )
+        self._mark_changed()
 
         if node.node_type == 'ending':
-            self._endings.add(node.node_id)
+            self._endings.add(node_id)
         elif node.node_type == 'decision':
-            self._decision_points.add(node.node_id)
+            self._decision_points.add(node_id)
 
     def add_edge(self, edge: StoryEdge) -> None:
         """Add an edge to the graph."""
         self.graph.add_edge(
-            edge.from_node,
-            edge.to_node,
+            _intern_id(edge.from_node),
+            _intern_id(edge.to_node),
             condition=edge.condition,
+            parsed_condition=_parse_condition(edge.condition),
             probability=edge.probability,
             label=edge.label
         )
+        self._mark_changed()
 
     def get_node(self, node_id: str) -> Optional[Dict[str, Any]]:
         """Get node data."""
@@ -106,25 +245,102 @@ class StoryGraph:
 
     def find_paths_to_endings(
         self,
-        from_node: str
+        from_node: str,
+        cutoff: Optional[int] = None
     ) -> Dict[str, List[List[str]]]:
-        """Find all paths from a node to each ending."""
+        """
+        Find all paths from a node to each ending, up to cutoff edges long.
+        Paths are cached until the graph changes, callers get fresh lists.
+        """
+        return _path_lists(self._paths_to_endings(from_node, cutoff))
+
+    def _paths_to_endings(
+        self,
+        from_node: str,
+        cutoff: Optional[int] = None
+    ) -> Dict[str, Tuple[Tuple[str, ...], ...]]:
+        """Cached, immutable form of find_paths_to_endings."""
+        cached = self._paths_cache.get((from_node, cutoff))
+        if cached is not None:
+            return cached
+
         paths_by_ending = {}
+        reachable = self._get_reachable_endings(from_node)
 
         for ending_id in self._endings:
+            if ending_id not in reachable:
+                continue  # No path exists, skip the search
             try:
-                paths = list(nx.all_simple_paths(
+                paths = tuple(map(tuple, nx.all_simple_paths(
                     self.graph,
                     from_node,
-                    ending_id
-                ))
+                    ending_id,
+                    cutoff=cutoff
+                )))
                 if paths:
                     paths_by_ending[ending_id] = paths
             except nx.NetworkXNoPath:
                 continue
 
+        self._paths_cache[(from_node, cutoff)] = paths_by_ending
         return paths_by_ending
 
+    def find_paths_to_endings_parallel(
+        self,
+        from_node: str,
+        cutoff: Optional[int] = None
+    ) -> Dict[str, List[List[str]]]:
+        """
+        Same as find_paths_to_endings, searching endings in the shared worker pool.
+        Small graphs or few reachable endings are searched serially.
+        """
+        cached = self._paths_cache.get((from_node, cutoff))
+        if cached is not None:
+            return _path_lists(cached)
+
+        reachable = self._get_reachable_endings(from_node)
+        targets = [ending_id for ending_id in self._endings if ending_id in reachable]
+
+        if (
+            len(targets) < _PARALLEL_MIN_ENDINGS
+            or self.graph.number_of_nodes() < _PARALLEL_MIN_NODES
+        ):
+            return self.find_paths_to_endings(from_node, cutoff)
+
+        # Each task carries the bare successor lists, no attributes
+        successors = {
+            node_id: tuple(node_successors)
+            for node_id, node_successors in self.freeze().items()
+        }
+        results = _get_path_pool().map(
+            _paths_to_ending,
+            repeat(successors), repeat(from_node), targets, repeat(cutoff)
+        )
+        paths_by_ending = {
+            ending_id: tuple(map(tuple, paths))
+            for ending_id, paths in zip(targets, results)
+            if paths
+        }
+
+        self._paths_cache[(from_node, cutoff)] = paths_by_ending
+        return _path_lists(paths_by_ending)
+
+    def _get_reachable_endings(self, from_node: str) -> Set[str]:
+        """Endings reachable from a node (an ending reaches itself)."""
+        if self._endings and from_node not in self.graph:
+            raise nx.NodeNotFound(f"source node {from_node} not in graph")
+
+        if self._reachable_endings is None:
+            # One reverse search per ending, shared by every source node
+            reachable_endings: Dict[str, Set[str]] = {}
+            for ending_id in self._endings:
+                reachable_endings.setdefault(ending_id, set()).add(ending_id)
+                for node_id in nx.ancestors(self.graph, ending_id):
+                    reachable_endings.setdefault(node_id, set()).add(ending_id)
+            self._reachable_endings = reachable_endings
+
+        return self._reachable_endings.get(from_node, set())
+
     def calculate_ending_probabilities(
         self,
         current_node: str,
@@ -134,115 +350,364 @@ class StoryGraph:
         """
         Calculate probabilities for each ending based on current state.
         """
-        # Get all paths to endings
-        paths_by_ending = self.find_paths_to_endings(current_node)
+        # Use the best path's weight for each reachable ending
+        ending_weights = self._best_weight_to_endings(
+            current_node, decisions_made, story_flags
+        )
 
-        if not paths_by_ending:
-            return {}
+        # Long paths of small probabilities underflow; when even the best
+        # weight is gone, compare the endings in log space instead
+        if (
+            ending_weights
+            and self._probabilities_bounded
+            and max(ending_weights.values()) < sys.float_info.min
+        ):
+            return self._log_space_probabilities(
+                current_node, decisions_made, story_flags
+            )
 
-        probabilities = {}
-        total_weight = 0.0
+        total_weight = sum(ending_weights.values())
 
-        for ending_id, paths in paths_by_ending.items():
-            # Calculate average path weight
-            path_weights = []
+        # Normalize to percentages
+        if total_weight > 0:
+            return {
+                ending_id: round((ending_weight / total_weight) * 100, 1)
+                for ending_id, ending_weight in ending_weights.items()
+            }
 
-            for path in paths:
-                weight = self._calculate_path_weight(
-                    path, decisions_made, story_flags
-                )
-                path_weights.append(weight)
+        return dict(ending_weights)
 
-            # Use the best path's weight for this ending
-            ending_weight = max(path_weights) if path_weights else 0.0
-            probabilities[ending_id] = ending_weight
-            total_weight += ending_weight
+    def _log_space_probabilities(
+        self,
+        current_node: str,
+        decisions_made: Dict[str, str],
+        story_flags: Dict[str, Any]
+    ) -> Dict[str, float]:
+        """
+        Ending percentages from best path log-weights, normalized relative
+        to the best ending so they stay finite.
+        """
+        unsatisfied = self._unsatisfied_conditions(
+            decisions_made, story_flags, _state_key(decisions_made, story_flags)
+        )
+        log_weights = self._search_best_log_weights(current_node, unsatisfied)
 
-        # Normalize to percentages
-        if total_weight > 0:
-            for ending_id in probabilities:
-                probabilities[ending_id] = round(
-                    (probabilities[ending_id] / total_weight) * 100, 1
-                )
+        best = max(log_weights.values(), default=-math.inf)
+        if best == -math.inf:
+            return {ending_id: 0.0 for ending_id in log_weights}
 
-        return probabilities
+        shares = {
+            ending_id: math.exp(log_weight - best)
+            for ending_id, log_weight in log_weights.items()
+        }
+        total_share = sum(shares.values())
+        return {
+            ending_id: round((share / total_share) * 100, 1)
+            for ending_id, share in shares.items()
+        }
 
-    def _calculate_path_weight(
+    def _best_weight_to_endings(
         self,
-        path: List[str],
+        from_node: str,
         decisions_made: Dict[str, str],
         story_flags: Dict[str, Any]
+    ) -> Dict[str, float]:
+        """
+        Get the best path weight from a node to each reachable ending.
+        Acyclic regions are solved in one topological pass; regions with
+        loops fall back to enumerating simple paths.
+        """
+        state_key = _state_key(decisions_made, story_flags)
+        key = (from_node, state_key) if state_key is not None else None
+
+        if key is not None:
+            cached = self._ending_weights_cache.get(key)
+            if cached is not None:
+                return cached
+
+        if not self._endings:
+            weights = {}
+        else:
+            if from_node not in self.graph:
+                raise nx.NodeNotFound(f"source node {from_node} not in graph")
+
+            # Evaluate each distinct condition once for this query
+            unsatisfied = self._unsatisfied_conditions(
+                decisions_made, story_flags, state_key
+            )
+            order = self._topological_order_from(from_node)
+
+            if order is not None:
+                weights = self._dag_best_weights(order, unsatisfied)
+            elif self._probabilities_bounded:
+                weights = self._search_best_weights(from_node, unsatisfied)
+            else:
+                paths_by_ending = self._paths_to_endings(from_node)
+                weights = {
+                    ending_id: max(
+                        self._path_weight(path, unsatisfied) for path in paths
+                    )
+                    for ending_id, paths in paths_by_ending.items()
+                }
+
+        if key is not None:
+            if len(self._ending_weights_cache) >= _STATE_CACHE_SIZE:
+                self._ending_weights_cache.clear()
+            self._ending_weights_cache[key] = weights
+        return weights
+
+    def freeze(self) -> Adjacency:
+        """
+        Build the compact adjacency used for path weighting.
+        Built lazily on first use otherwise; any mutation discards it.
+        """
+        if self._adjacency is None:
+            adjacency = {
+                node_id: {
+                    succ_id: (
+                        edge_data.get("probability", 1.0),
+                        edge_data.get("parsed_condition"),
+                    )
+                    for succ_id, edge_data in successors.items()
+                }
+                for node_id, successors in self.graph.adj.items()
+            }
+            self._edge_conditions = frozenset(
+                condition
+                for successors in adjacency.values()
+                for _, condition in successors.values()
+                if condition
+            )
+            self._probabilities_bounded = all(
+                isinstance(probability, (int, float)) and 0 <= probability <= 1
+                for successors in adjacency.values()
+                for probability, _ in successors.values()
+            )
+            self._adjacency = adjacency
+        return self._adjacency
+
+    def _unsatisfied_conditions(
+        self,
+        decisions_made: Dict[str, str],
+        story_flags: Dict[str, Any],
+        state_key: Optional[StateKey]
+    ) -> FrozenSet[ParsedCondition]:
+        """
+        Distinct edge conditions that fail for these decisions and flags.
+        state_key is their hashable snapshot, None when flags are unhashable.
+        """
+        if state_key is not None:
+            cached = self._unsatisfied_cache.get(state_key)
+            if cached is not None:
+                return cached
+
+        self.freeze()
+        check = self._check_condition
+        unsatisfied = frozenset(
+            condition for condition in self._edge_conditions
+            if not check(condition, decisions_made, story_flags)
+        )
+
+        if state_key is not None:
+            if len(self._unsatisfied_cache) >= _STATE_CACHE_SIZE:
+                self._unsatisfied_cache.clear()
+            self._unsatisfied_cache[state_key] = unsatisfied
+        return unsatisfied
+
+    def _topological_order_from(self, from_node: str) -> Optional[List[str]]:
+        """
+        Topologically order the nodes reachable from from_node.
+        Returns None when a loop is reachable.
+        """
+        adjacency = self.freeze()
+        on_stack, done = {from_node}, set()
+        order = []
+        stack = [(from_node, iter(adjacency[from_node]))]
+
+        while stack:
+            node_id, successors = stack[-1]
+            for succ_id in successors:
+                if succ_id in on_stack:
+                    return None  # Back edge, the region has a loop
+                if succ_id not in done:
+                    on_stack.add(succ_id)
+                    stack.append((succ_id, iter(adjacency[succ_id])))
+                    break
+            else:
+                stack.pop()
+                on_stack.discard(node_id)
+                done.add(node_id)
+                order.append(node_id)
+
+        order.reverse()
+        return order
+
+    def _dag_best_weights(
+        self,
+        order: List[str],
+        unsatisfied: FrozenSet[ParsedCondition]
+    ) -> Dict[str, float]:
+        """Best path weight to each ending, given an acyclic topological order."""
+        # Weights grow along each path in the same order as _path_weight,
+        # so the best prefix always extends to the best full path
+        adjacency = self.freeze()
+        best = {order[0]: 1.0}
+
+        for node_id in order:
+            node_weight = best[node_id]
+            for succ_id, (probability, condition) in adjacency[node_id].items():
+                weight = node_weight * probability
+
+                if condition in unsatisfied:
+                    weight *= 0.1  # Heavily penalize unsatisfied conditions
+
+                if succ_id not in best or weight > best[succ_id]:
+                    best[succ_id] = weight
+
+        return {
+            ending_id: best[ending_id]
+            for ending_id in self._endings
+            if ending_id in best
+        }
+
+    def _search_best_weights(
+        self,
+        from_node: str,
+        unsatisfied: FrozenSet[ParsedCondition]
+    ) -> Dict[str, float]:
+        """
+        Best path weight to each reachable ending, for graphs with loops.
+        With every edge factor in [0, 1] going around a loop never helps, so
+        a best-first (Dijkstra) search finds the best simple path exactly.
+        """
+        adjacency = self.freeze()
+        best = {from_node: 1.0}
+        done = set()
+        heap = [(-1.0, from_node)]
+
+        while heap:
+            neg_weight, node_id = heapq.heappop(heap)
+            if node_id in done:
+                continue
+            done.add(node_id)
+
+            node_weight = -neg_weight
+            for succ_id, (probability, condition) in adjacency[node_id].items():
+                if succ_id in done:
+                    continue
+
+                weight = node_weight * probability
+                if condition in unsatisfied:
+                    weight *= 0.1  # Heavily penalize unsatisfied conditions
+
+                if succ_id not in best or weight > best[succ_id]:
+                    best[succ_id] = weight
+                    heapq.heappush(heap, (-weight, succ_id))
+
+        return {
+            ending_id: best[ending_id]
+            for ending_id in self._endings
+            if ending_id in best
+        }
+
+    def _search_best_log_weights(
+        self,
+        from_node: str,
+        unsatisfied: FrozenSet[ParsedCondition]
+    ) -> Dict[str, float]:
+        """
+        _search_best_weights over summed log probabilities, which never underflow.
+        Requires every edge probability in [0, 1]; zero weights become -inf.
+        """
+        adjacency = self.freeze()
+        best = {from_node: 0.0}
+        done = set()
+        heap = [(-0.0, from_node)]
+
+        while heap:
+            neg_weight, node_id = heapq.heappop(heap)
+            if node_id in done:
+                continue
+            done.add(node_id)
+
+            node_weight = -neg_weight
+            for succ_id, (probability, condition) in adjacency[node_id].items():
+                if succ_id in done:
+                    continue
+
+                weight = node_weight + (
+                    math.log(probability) if probability > 0 else -math.inf
+                )
+                if condition in unsatisfied:
+                    weight += _LOG_UNSATISFIED_PENALTY
+
+                if succ_id not in best or weight > best[succ_id]:
+                    best[succ_id] = weight
+                    heapq.heappush(heap, (-weight, succ_id))
+
+        return {
+            ending_id: best[ending_id]
+            for ending_id in self._endings
+            if ending_id in best
+        }
+
+    def _path_weight(
+        self,
+        path: List[str],
+        unsatisfied: FrozenSet[ParsedCondition]
     ) -> float:
-        """Calculate weight/probability for a specific path."""
+        """Weight of a path, given the conditions that fail for this query."""
+        adjacency = self.freeze()
         weight = 1.0
 
-        for i in range(len(path) - 1):
-            from_node = path[i]
-            to_node = path[i + 1]
-
-            edge_data = self.graph.edges.get((from_node, to_node), {})
-            condition = edge_data.get("condition")
-            base_prob = edge_data.get("probability", 1.0)
+        for from_node, to_node in zip(path, islice(path, 1, None)):
+            base_prob, condition = adjacency.get(from_node, {}).get(
+                to_node, (1.0, None)
+            )
 
             # Apply base probability
             weight *= base_prob
 
             # Check condition satisfaction
-            if condition:
-                satisfied = self._check_condition(
-                    condition, decisions_made, story_flags
-                )
-                if not satisfied:
-                    weight *= 0.1  # Heavily penalize unsatisfied conditions
+            if condition in unsatisfied:
+                weight *= 0.1  # Heavily penalize unsatisfied conditions
 
         return weight
 
+    @staticmethod
     def _check_condition(
-        self,
-        condition: str,
+        condition: ParsedCondition,
         decisions_made: Dict[str, str],
         story_flags: Dict[str, Any]
     ) -> bool:
-        """Check if a condition is satisfied."""
-        # Parse condition string (simple format: "flag:value" or "decision:code:option")
-        parts = condition.split(":")
-
-        if len(parts) == 2:
-            # Flag check: "flag_name:true/false"
-            flag_name, expected = parts
-            actual = story_flags.get(flag_name)
-            if expected.lower() == "true":
-                return bool(actual)
-            elif expected.lower() == "false":
-                return not actual
-            else:
-                return str(actual) == expected
-
-        elif len(parts) == 3 and parts[0] == "decision":
-            # Decision check: "decision:code:option"
-            _, decision_code, expected_option = parts
-            actual_option = decisions_made.get(decision_code)
-            return actual_option == expected_option
-
-        return True  # Unknown condition format, assume satisfied
+        """Check if a parsed condition is satisfied."""
+        return _CONDITION_CHECKS[condition[0]](condition, decisions_made, story_flags)
 
     def get_decision_points_ahead(
         self,
         current_node: str,
         max_depth: int = 5
     ) -> List[Dict[str, Any]]:
-        """Get upcoming decision points within a certain depth."""
+        """
+        Get upcoming decision points within a certain depth.
+        Explored breadth-first, so each depth is the shortest distance.
+        """
         decision_points = []
-        visited = set()
+        if max_depth < 0:
+            return decision_points
 
-        def explore(node_id: str, depth: int):
-            if depth > max_depth or node_id in visited:
-                return
+        successors = self.graph.successors
+        nodes = self.graph.nodes
+        decision_ids = self._decision_points
 
-            visited.add(node_id)
+        queue = deque([(current_node, 0)])
+        visited = {current_node}
 
-            if node_id in self._decision_points:
-                node_data = self.graph.nodes[node_id]
+        while queue:
+            node_id, depth = queue.popleft()
+
+            if node_id in decision_ids:
+                node_data = nodes[node_id]
                 decision_points.append({
                     "node_id": node_id,
                     "title": node_data.get("title"),
@@ -250,14 +715,28 @@ class StoryGraph:
                     "data": node_data.get("data", {})
                 })
 
-            for succ_id in self.graph.successors(node_id):
-                explore(succ_id, depth + 1)
+            if depth < max_depth:
+                for succ_id in successors(node_id):
+                    if succ_id not in visited:
+                        visited.add(succ_id)
+                        queue.append((succ_id, depth + 1))
 
-        explore(current_node, 0)
         return decision_points
 
+    def has_cycles(self) -> bool:
+        """Check whether the story graph contains any loop."""
+        if self._has_cycles is None:
+            self._has_cycles = nx.number_of_selfloops(self.graph) > 0 or any(
+                len(component) > 1
+                for component in nx.strongly_connected_components(self.graph)
+            )
+        return self._has_cycles
+
     def detect_loops(self) -> List[List[str]]:
         """Detect any loops in the story graph."""
+        if not self.has_cycles():
+            return []
+
         try:
             cycles = list(nx.simple_cycles(self.graph))
             return cycles
@@ -275,26 +754,40 @@ class StoryGraph:
 
     def get_critical_path(self, start_node: str, end_node: str) -> Optional[List[str]]:
         """Get the shortest/most likely path between two nodes."""
-        try:
-            return nx.shortest_path(self.graph, start_node, end_node)
-        except nx.NetworkXNoPath:
-            return None
+        key = (start_node, end_node)
+        if key not in self._critical_path_cache:
+            try:
+                path = nx.shortest_path(self.graph, start_node, end_node)
+            except nx.NetworkXNoPath:
+                path = None
+            self._critical_path_cache[key] = path
+
+        path = self._critical_path_cache[key]
+        return list(path) if path is not None else None
 
     def get_branch_analysis(self, node_id: str) -> Dict[str, Any]:
         """Analyze branches from a node."""
+        cached = self._branch_analysis_cache.get(node_id)
+        if cached is not None:
+            return _copy_branch_analysis(cached)
+
         successors = self.get_successors(node_id)
+        reachable = self._get_reachable_endings(node_id)
 
-        return {
+        analysis = {
             "node_id": node_id,
             "branch_count": len(successors),
             "branches": successors,
             "has_conditional_branches": any(
                 s.get("condition") for s in successors
             ),
-            "endings_reachable": list(
-                self.find_paths_to_endings(node_id).keys()
-            )
+            "endings_reachable": [
+                ending_id for ending_id in self._endings
+                if ending_id in reachable
+            ]
         }
+        self._branch_analysis_cache[node_id] = analysis
+        return _copy_branch_analysis(analysis)
 
     def build_from_campaign_data(self, campaign_data: Dict[str, Any]) -> None:
         """Build graph from campaign database data."""
@@ -351,38 +844,118 @@ class StoryGraph:
                 data=ending
             ))
 
+        self.freeze()
+
+    def iter_nodes(self) -> Iterator[Dict[str, Any]]:
+        """Yield exported node dicts one at a time."""
+        for node_id, node_data in self.graph.nodes(data=True):
+            yield {"id": node_id, **node_data}
+
+    def iter_edges(self) -> Iterator[Dict[str, Any]]:
+        """Yield exported edge dicts one at a time (parsed conditions are internal)."""
+        for u, v, edge_data in self.graph.edges(data=True):
+            edge = {"from": u, "to": v, **edge_data}
+            edge.pop("parsed_condition", None)
+            yield edge
+
     def export_to_dict(self) -> Dict[str, Any]:
         """Export graph to dictionary format."""
         return {
-            "nodes": [
-                {"id": n, **self.graph.nodes[n]}
-                for n in self.graph.nodes
-            ],
-            "edges": [
-                {
-                    "from": u,
-                    "to": v,
-                    **self.graph.edges[u, v]
-                }
-                for u, v in self.graph.edges
-            ],
+            "nodes": list(self.iter_nodes()),
+            "edges": list(self.iter_edges()),
             "endings": list(self._endings),
             "decision_points": list(self._decision_points)
         }
 
 
-# Cache for campaign graphs
-_campaign_graphs: Dict[int, StoryGraph] = {}
+# Worker processes for find_paths_to_endings_parallel, started on first use
+_path_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_path_pool() -> ProcessPoolExecutor:
+    """Get or start the shared path search pool."""
+    global _path_pool
+    if _path_pool is None:
+        _path_pool = ProcessPoolExecutor()
+    return _path_pool
+
+
+def shutdown_path_pool() -> None:
+    """Stop the shared path search pool, if it was started."""
+    global _path_pool
+    if _path_pool is not None:
+        _path_pool.shutdown()
+        _path_pool = None
+
+
+def _paths_to_ending(
+    successors: Dict[str, Tuple[str, ...]],
+    from_node: str,
+    ending_id: str,
+    cutoff: Optional[int]
+) -> List[List[str]]:
+    """All simple paths to one ending, run inside a worker process."""
+    graph = nx.DiGraph(successors)
+    return list(nx.all_simple_paths(graph, from_node, ending_id, cutoff=cutoff))
+
+
+def _path_lists(
+    paths_by_ending: Dict[str, Tuple[Tuple[str, ...], ...]]
+) -> Dict[str, List[List[str]]]:
+    """Fresh list-of-lists copy of cached paths per ending."""
+    return {
+        ending_id: [list(path) for path in paths]
+        for ending_id, paths in paths_by_ending.items()
+    }
+
+
+def _copy_branch_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cached branch analysis down to its branch dicts."""
+    return {
+        **analysis,
+        "branches": [dict(branch) for branch in analysis["branches"]],
+        "endings_reachable": list(analysis["endings_reachable"]),
+    }
+
+
+def _intern_id(node_id: str) -> str:
+    """Intern string node ids, which key every graph lookup."""
+    return sys.intern(node_id) if type(node_id) is str else node_id
+
+
+def _state_key(
+    decisions_made: Dict[str, str],
+    story_flags: Dict[str, Any]
+) -> Optional[StateKey]:
+    """Hashable snapshot of decisions and flags, None if a flag value is unhashable."""
+    try:
+        return (
+            frozenset((key, type(value), value) for key, value in decisions_made.items()),
+            frozenset((key, type(value), value) for key, value in story_flags.items()),
+        )
+    except TypeError:
+        return None
+
+
+# Cache for campaign graphs, least recently used evicted first
+_MAX_CAMPAIGN_GRAPHS = 64
+_campaign_graphs: "OrderedDict[int, StoryGraph]" = OrderedDict()
 
 
 def get_campaign_graph(campaign_id: int) -> Optional[StoryGraph]:
     """Get cached campaign graph."""
-    return _campaign_graphs.get(campaign_id)
+    graph = _campaign_graphs.get(campaign_id)
+    if graph is not None:
+        _campaign_graphs.move_to_end(campaign_id)
+    return graph
 
 
 def set_campaign_graph(campaign_id: int, graph: StoryGraph) -> None:
     """Cache campaign graph."""
     _campaign_graphs[campaign_id] = graph
+    _campaign_graphs.move_to_end(campaign_id)
+    if len(_campaign_graphs) > _MAX_CAMPAIGN_GRAPHS:
+        _campaign_graphs.popitem(last=False)
 
 
 def clear_campaign_graph(campaign_id: int) -> None:
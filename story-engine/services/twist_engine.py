@@ -3,12 +3,22 @@ Twist Engine Service.
 Manages plot twists, revelations, timing, and foreshadowing.
 """
 
-from typing import Optional, List, Dict, Any, Set
+import heapq
+from typing import Optional, List, Dict, Any, Set, FrozenSet, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
 
-@dataclass
+# Readiness bonus per tension level, unknown levels count as "normal"
+_TENSION_BONUSES: Dict[str, float] = {
+    "low": 0.0,
+    "normal": 0.05,
+    "high": 0.15,
+    "critical": 0.2,
+}
+
+
+@dataclass(slots=True)
 class Twist:
     """A plot twist or revelation."""
     twist_id: str
@@ -34,7 +44,7 @@ class Twist:
     affects_ending: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class RedHerring:
     """A false clue or misleading element."""
     herring_id: str
@@ -63,9 +73,19 @@ class TwistEngine:
         self.deployed_herrings: Set[str] = set()
         self.foreshadowed: Dict[str, int] = {}  # twist_id -> count
 
+        # clue -> ids of twists requiring it, rebuilt after registrations
+        self._clue_index: Optional[Dict[str, List[str]]] = None
+
+        # Twist requirements frozen at registration, keyed by twist id
+        self._required_clue_sets: Dict[str, FrozenSet[str]] = {}
+        self._required_flags: Dict[str, Tuple[str, ...]] = {}
+
     def register_twist(self, twist: Twist) -> None:
         """Register a plot twist."""
         self.twists[twist.twist_id] = twist
+        self._required_clue_sets[twist.twist_id] = frozenset(twist.required_clues)
+        self._required_flags[twist.twist_id] = tuple(twist.required_flags)
+        self._clue_index = None
 
     def register_red_herring(self, herring: RedHerring) -> None:
         """Register a red herring."""
@@ -82,6 +102,10 @@ class TwistEngine:
         revealed_clues = set(story_state.get("revealed_clues", []))
         story_flags = story_state.get("story_flags", {})
         tension_level = story_state.get("tension_level", "normal")
+        tension_bonus = _TENSION_BONUSES.get(tension_level, 0.05)
+
+        # Required clues found per twist, in one pass over the revealed clues
+        clues_by_twist = self._count_clues_found(revealed_clues)
 
         candidates = []
 
@@ -94,18 +118,19 @@ class TwistEngine:
                 continue
 
             # Check required flags
-            if twist.required_flags:
-                if not all(story_flags.get(f) for f in twist.required_flags):
+            required_flags = self._required_flags[twist_id]
+            if required_flags:
+                if not all(story_flags.get(f) for f in required_flags):
                     continue
 
             # Check clues
-            clues_found = len(set(twist.required_clues) & revealed_clues)
+            clues_found = clues_by_twist.get(twist_id, 0)
             if clues_found < twist.min_clues_for_reveal:
                 continue
 
             # Calculate readiness score
             readiness = self._calculate_readiness(
-                twist, clues_found, story_state, tension_level
+                twist, clues_found, current_act, tension_bonus
             )
 
             if readiness >= 0.7:  # Threshold for revelation
@@ -114,16 +139,30 @@ class TwistEngine:
         if not candidates:
             return None
 
-        # Return highest readiness twist
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        return candidates[0][0]
+        # Return highest readiness twist (first registered wins ties)
+        return max(candidates, key=lambda x: x[1])[0]
+
+    def _count_clues_found(self, revealed_clues: Set[str]) -> Dict[str, int]:
+        """Count revealed required clues per twist id (twists with none are absent)."""
+        if self._clue_index is None:
+            clue_index: Dict[str, List[str]] = {}
+            for twist_id, required_clues in self._required_clue_sets.items():
+                for clue in required_clues:
+                    clue_index.setdefault(clue, []).append(twist_id)
+            self._clue_index = clue_index
+
+        clues_by_twist: Dict[str, int] = {}
+        for clue in revealed_clues:
+            for twist_id in self._clue_index.get(clue, ()):
+                clues_by_twist[twist_id] = clues_by_twist.get(twist_id, 0) + 1
+        return clues_by_twist
 
     def _calculate_readiness(
         self,
         twist: Twist,
         clues_found: int,
-        story_state: Dict[str, Any],
-        tension_level: str
+        current_act: int,
+        tension_bonus: float
     ) -> float:
         """Calculate readiness score for a twist reveal."""
         score = 0.0
@@ -141,16 +180,9 @@ class TwistEngine:
         score += foreshadow_score
 
         # Tension bonus (0-0.2)
-        tension_bonuses = {
-            "low": 0.0,
-            "normal": 0.05,
-            "high": 0.15,
-            "critical": 0.2,
-        }
-        score += tension_bonuses.get(tension_level, 0.05)
+        score += tension_bonus
 
         # Act progression bonus (0-0.2)
-        current_act = story_state.get("current_act", 1)
         if current_act > twist.required_act:
             act_bonus = min((current_act - twist.required_act) * 0.1, 0.2)
             score += act_bonus
@@ -186,7 +218,7 @@ class TwistEngine:
                         continue
 
                     # Calculate if we should foreshadow now
-                    clues_found = len(set(twist.required_clues) & revealed_clues)
+                    clues_found = len(self._required_clue_sets[twist_id] & revealed_clues)
                     total_clues = len(twist.required_clues) or 1
 
                     # More foreshadowing as we approach revelation
@@ -201,9 +233,8 @@ class TwistEngine:
                     }
                     hints.append(hint)
 
-        # Sort by priority and limit
-        hints.sort(key=lambda x: x["priority"], reverse=True)
-        return hints[:3]  # Max 3 foreshadowing hints per scene
+        # Top priorities only, max 3 foreshadowing hints per scene
+        return heapq.nlargest(3, hints, key=lambda x: x["priority"])
 
     def record_foreshadowing(self, twist_id: str) -> None:
         """Record that a twist has been foreshadowed."""
@@ -328,7 +359,8 @@ class TwistEngine:
             self.register_red_herring(herring)
 
 
-# Cache for campaign twist engines
+# Cache for campaign twist engines. Not bounded: an engine is the only record
+# of its campaign's revealed twists, deployed herrings and foreshadowing
 _campaign_engines: Dict[int, TwistEngine] = {}
 
 
@@ -0,0 +1,160 @@
+"""
+Story graph ending probabilities checked against brute-force path enumeration.
+"""
+
+import random
+
+import networkx as nx
+import pytest
+
+from services.story_graph import StoryGraph, StoryNode, StoryEdge
+
+
+CONDITIONS = [
+    None, None, "f1:true", "f2:false", "f3:x", "x:1",
+    "decision:d1:a", "decision:d2:b", "weird:a:b:c",
+]
+STATES = [
+    ({}, {}),
+    ({"d1": "a"}, {"f1": True, "f3": "x"}),
+    ({"d2": "b"}, {"f2": True, "x": 1}),
+    ({}, {"x": True}),
+]
+ENDINGS = [f"ending_{k}" for k in range(4)]
+
+
+def reference_satisfied(condition, decisions, flags):
+    """Condition semantics, written out independently of the service."""
+    if not condition:
+        return True
+    parts = condition.split(":")
+    if len(parts) == 2:
+        flag, expected = parts
+        if expected.lower() == "true":
+            return bool(flags.get(flag))
+        if expected.lower() == "false":
+            return not flags.get(flag)
+        return str(flags.get(flag)) == expected
+    if len(parts) == 3 and parts[0] == "decision":
+        return decisions.get(parts[1]) == parts[2]
+    return True
+
+
+def reference_probabilities(graph, start, decisions, flags):
+    """Best simple-path weight per ending by enumeration, then normalized."""
+    weights = {}
+    for ending_id in graph._endings:
+        best = None
+        for path in nx.all_simple_paths(graph.graph, start, ending_id):
+            weight = 1.0
+            for u, v in zip(path, path[1:]):
+                edge = graph.graph.edges[u, v]
+                weight *= edge["probability"]
+                if not reference_satisfied(edge["condition"], decisions, flags):
+                    weight *= 0.1
+            if best is None or weight > best:
+                best = weight
+        if best is not None:
+            weights[ending_id] = best
+
+    total = sum(weights.values())
+    if total > 0:
+        return {e: round((w / total) * 100, 1) for e, w in weights.items()}
+    return weights
+
+
+def random_graph(seed, cyclic, probabilities=(1.0, 0.5, 0.3, 0.9)):
+    """Random campaign-like graph; cyclic graphs get some backward edges."""
+    rng = random.Random(seed)
+    size = 10 + seed % 5
+    graph = StoryGraph()
+    for i in range(size):
+        graph.add_node(StoryNode(node_id=f"scene_{i}", node_type="scene", title=str(i)))
+    for ending_id in ENDINGS:
+        graph.add_node(StoryNode(node_id=ending_id, node_type="ending", title=ending_id))
+
+    for i in range(size):
+        for _ in range(rng.randint(1, 3)):
+            if cyclic and rng.random() < 0.2:
+                j = rng.randint(0, size - 1)
+            else:
+                j = rng.randint(i + 1, size + 3)
+            target = f"scene_{j}" if j < size else ENDINGS[j - size]
+            graph.add_edge(StoryEdge(
+                from_node=f"scene_{i}",
+                to_node=target,
+                condition=rng.choice(CONDITIONS),
+                probability=rng.choice(probabilities),
+            ))
+    return graph
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+@pytest.mark.parametrize("seed", range(30))
+def test_probabilities_match_enumeration(seed, cyclic):
+    graph = random_graph(seed, cyclic)
+    for start in ("scene_0", "scene_4"):
+        for decisions, flags in STATES:
+            expected = reference_probabilities(graph, start, decisions, flags)
+            assert graph.calculate_ending_probabilities(start, decisions, flags) == expected
+
+
+def test_cyclic_graphs_exercise_the_loop_search():
+    looping = sum(random_graph(seed, cyclic=True).has_cycles() for seed in range(30))
+    assert looping >= 20
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_unbounded_probabilities_fall_back_to_enumeration(seed):
+    graph = random_graph(seed, cyclic=True, probabilities=(1.5, 0.5, 2.0))
+    # A loop right at the start, so the best-first search cannot be used
+    graph.add_edge(StoryEdge(from_node="scene_0", to_node="scene_1", probability=1.5))
+    graph.add_edge(StoryEdge(from_node="scene_1", to_node="scene_0", probability=0.5))
+    assert graph.has_cycles()
+
+    for decisions, flags in STATES:
+        expected = reference_probabilities(graph, "scene_0", decisions, flags)
+        assert graph.calculate_ending_probabilities("scene_0", decisions, flags) == expected
+
+
+def test_underflowing_weights_compared_in_log_space():
+    graph = StoryGraph()
+    length = 800
+    for i in range(length):
+        graph.add_node(StoryNode(node_id=f"s{i}", node_type="scene", title=str(i)))
+    for ending_id in ("a", "b", "z"):
+        graph.add_node(StoryNode(node_id=ending_id, node_type="ending", title=ending_id))
+    for i in range(length - 1):
+        graph.add_edge(StoryEdge(from_node=f"s{i}", to_node=f"s{i + 1}", probability=0.3))
+    last = f"s{length - 1}"
+    graph.add_edge(StoryEdge(from_node=last, to_node="a", probability=0.9))
+    graph.add_edge(StoryEdge(from_node=last, to_node="b", probability=0.3))
+    graph.add_edge(StoryEdge(from_node=last, to_node="z", probability=0.0))
+
+    # The plain product is gone, which is what forces the fallback
+    assert 0.3 ** length == 0.0
+
+    probabilities = graph.calculate_ending_probabilities("s0", {}, {})
+    assert probabilities == {"a": 75.0, "b": 25.0, "z": 0.0}
+
+    # Also with a loop, through the best-first search
+    graph.add_edge(StoryEdge(from_node="s5", to_node="s2", probability=0.5))
+    assert graph.has_cycles()
+    assert graph.calculate_ending_probabilities("s0", {}, {}) == probabilities
+
+
+def test_flag_values_equal_across_types_are_cached_apart():
+    def build():
+        graph = StoryGraph()
+        graph.add_node(StoryNode(node_id="s", node_type="scene", title="s"))
+        graph.add_node(StoryNode(node_id="a", node_type="ending", title="a"))
+        graph.add_node(StoryNode(node_id="b", node_type="ending", title="b"))
+        graph.add_edge(StoryEdge(from_node="s", to_node="a", condition="x:1"))
+        graph.add_edge(StoryEdge(from_node="s", to_node="b"))
+        return graph
+
+    graph = build()
+    assert graph.calculate_ending_probabilities("s", {}, {"x": 1}) == {"a": 50.0, "b": 50.0}
+    assert graph.calculate_ending_probabilities("s", {}, {"x": True}) == {"a": 9.1, "b": 90.9}
+    assert graph.calculate_ending_probabilities("s", {}, {"x": 1.0}) == {"a": 9.1, "b": 90.9}
+    assert build().calculate_ending_probabilities("s", {}, {"x": True}) == {"a": 9.1, "b": 90.9}